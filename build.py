@@ -1,12 +1,25 @@
 import os
+import re
 import shutil
 import math
-import markdown
+import hashlib
+import filecmp
+import argparse
+import time
+import errno
+import gzip
+import queue
+import threading
+import html as htmllib
+import importlib.util
+import copy
+import datetime
+from collections import Counter, deque
+from html.parser import HTMLParser
+from urllib.parse import quote, unquote, urljoin, urlsplit
 import json
-from jinja2 import Environment, FileSystemLoader
-from pygments import highlight
-from pygments.lexers import get_lexer_by_name
-from pygments.formatters import HtmlFormatter
+import pygments
+import myanmar
 
 # --- CONFIGURATION ---
 BASE_URL = "https://sdmm.site"  # <--- အစ်ကို့ Domain အမှန်
@@ -16,13 +29,248 @@ CONTENT_DIR = 'content'
 OUTPUT_DIR = 'docs'
 TEMPLATE_DIR = 'templates'
 POSTS_PER_PAGE = 6
+# Number archive pages from the oldest post (archive-N.html) so that a new
+# post only changes the front page and the newest archive page
+STABLE_PAGINATION = False
+
+# Incremental build state (manifest, caches) - not published
+BUILD_CACHE_DIR = '.build'
+MANIFEST_PATH = os.path.join(BUILD_CACHE_DIR, 'manifest.json')
+STAGING_DIR = os.path.join(BUILD_CACHE_DIR, 'staging')
+MANIFEST_VERSION = 1
+# Outputs older versions of this script published and this one never does;
+# removed even when no manifest recorded them (search.json became search/)
+RETIRED_OUTPUTS = ['search.json']
+MARKDOWN_EXTENSIONS = ['meta', 'fenced_code', 'codehilite']
+HIGHLIGHT_STYLE = 'monokai'
+# Classes in converted Markdown that are not in its source
+MARKDOWN_CLASSES = {'codehilite'}
+
+# Converted Markdown, keyed by source and converter settings
+RENDER_CACHE_DIR = os.path.join(BUILD_CACHE_DIR, 'render')
+RENDER_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Highlighted code blocks, keyed by language, code and highlighter settings
+HIGHLIGHT_CACHE_DIR = os.path.join(BUILD_CACHE_DIR, 'highlight')
+HIGHLIGHT_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+# Compiled template bytecode, and templates compiled to Python modules
+# ahead of time by --precompile-templates
+TEMPLATE_BYTECODE_DIR = os.path.join(BUILD_CACHE_DIR, 'jinja')
+COMPILED_TEMPLATE_DIR = os.path.join(BUILD_CACHE_DIR, 'compiled-templates')
+COMPILED_TEMPLATE_INFO = 'templates.json'
+
+# Word counts by post source, and the last self-hosted vendor CSS and fonts
+WORD_COUNT_CACHE = os.path.join(BUILD_CACHE_DIR, 'word-counts.json')
+ASSET_CACHE_DIR = os.path.join(BUILD_CACHE_DIR, 'assets')
+# Versions and features of installed packages (see installed_fact)
+INSTALLED_CACHE = os.path.join(BUILD_CACHE_DIR, 'installed.json')
+
+# Precompressed siblings (.br needs the brotli package; .gz always)
+COMPRESS_EXTENSIONS = ('.html', '.css', '.js', '.json', '.svg', '.xml', '.txt')
+
+# --watch: quiet period that ends a burst of edits, and the polling fallback rate
+WATCH_DEBOUNCE = 0.3
+WATCH_POLL_INTERVAL = 0.5
+
+# --serve: local preview with live reload
+SERVE_PORT = 8000
+SERVE_DEBOUNCE = 0.05
+LIVE_RELOAD_PATH = '/__livereload'
+LIVE_RELOAD_SCRIPT = f"""<script>new EventSource('{LIVE_RELOAD_PATH}').onmessage = () => location.reload();</script>"""
+
+# Responsive image variants (needs Pillow; skipped without it)
+IMAGE_VARIANT_DIR = 'img'
+IMAGE_CACHE_DIR = os.path.join(BUILD_CACHE_DIR, 'images')
+IMAGE_WIDTHS = (480, 960, 1600)
+IMAGE_QUALITY = {'avif': 50, 'webp': 75, 'jpeg': 80}
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+# Rendered width of the post body (.col-lg-9 of the page container)
+IMAGE_SIZES = '(min-width: 1400px) 966px, (min-width: 992px) 75vw, 100vw'
+
+# Fingerprinted assets extracted from templates; served with a year-long cache
+ASSET_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+ASSET_PIPELINE_VERSION = 1
+HEADERS_FILE = '_headers'
+
+# --- ASSET PIPELINE ---
+_INLINE_BLOCK_RE = re.compile(r'<(style|script)>(.*?)</\1>', re.S)
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+_STYLESHEET_LINK_RE = re.compile(r'<link\b[^>]*\bhref="(https?://[^"]+\.css)"[^>]*>')
+_LINK_TAG_RE = re.compile(r'<link\b[^>]*\bhref="([^"]+)"[^>]*>')
+
+def minify_css(css):
+    css = _CSS_COMMENT_RE.sub('', css)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+def minify_js(js):
+    """Conservative: drop indentation, blank lines and whole-line // comments"""
+    lines = (line.strip() for line in js.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+class TemplateAssets:
+    """Moves inline <style>/<script> blocks out of template sources.
+
+    Each static block (no Jinja tags inside) is minified and replaced by a
+    link to `css/site.<hash>.css` or `js/site.<hash>.js`, so browsers fetch
+    it once and cache it across pages. The extracted files are collected in
+    `assets` (relpath -> text or bytes) for the build to write, alongside
+    the self-hosted vendor files; `link_rewrites` maps CDN hrefs to the
+    tags that replace them.
+    """
+
+    def __init__(self):
+        self.assets = {}
+        self.link_rewrites = {}
+
+    def process(self, source):
+        source = _LINK_TAG_RE.sub(self._rewrite_link, source)
+        return _INLINE_BLOCK_RE.sub(self._extract, source)
+
+    def _rewrite_link(self, match):
+        return self.link_rewrites.get(match.group(1), match.group(0))
+
+    def _extract(self, match):
+        kind, body = match.groups()
+        if '{{' in body or '{%' in body:
+            return match.group(0)
+        if kind == 'style':
+            text = minify_css(body)
+            relpath = f"css/site.{hashlib.sha256(text.encode('utf-8')).hexdigest()[:10]}.css"
+            tag = f'<link rel="stylesheet" href="{relpath}">'
+        else:
+            text = minify_js(body)
+            relpath = f"js/site.{hashlib.sha256(text.encode('utf-8')).hexdigest()[:10]}.js"
+            tag = f'<script src="{relpath}"></script>'
+        self.assets[relpath] = text
+        return tag
+
+template_assets = TemplateAssets()
+
+# Self-hosted, purged copies of the CDN stylesheets linked from templates
+VENDOR_DIR = 'vendor'
+VENDOR_CACHE_DIR = os.path.join(BUILD_CACHE_DIR, 'vendor')
+# Classes added at runtime by Bootstrap's and AOS's own scripts
+VENDOR_CSS_SAFELIST = {
+    'show', 'showing', 'hiding', 'fade', 'collapse', 'collapsing', 'active', 'disabled',
+    'modal-open', 'modal-backdrop', 'offcanvas-backdrop', 'dropdown-menu-end',
+    'aos-init', 'aos-animate',
+}
+
+# A download that failed is not retried for this long; asset results built
+# without it are cached until then too, so offline builds stay fast
+VENDOR_RETRY_SECONDS = 15 * 60
+VENDOR_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36'
+
+# Self-hosted web fonts, subset to the characters the site actually uses
+FONTS_DIR = 'fonts'
+FONT_CACHE_DIR = os.path.join(BUILD_CACHE_DIR, 'fonts')
+FONT_DISPLAY = 'swap'
+# (family, weight) faces fetched early with <link rel="preload">
+FONT_PRELOAD = [('Noto Sans Myanmar', '400'), ('Space Grotesk', '700')]
+_GOOGLE_FONTS_CSS_RE = re.compile(r'<link\b[^>]*\bhref="(https://fonts\.googleapis\.com/css2?\?[^"]+)"[^>]*>')
+_FONT_ORIGINS = ('https://fonts.googleapis.com', 'https://fonts.gstatic.com')
 
 # --- SETUP JINJA2 ---
-if not os.path.exists(TEMPLATE_DIR):
-    print(f"❌ Error: '{TEMPLATE_DIR}' folder မရှိပါ။")
-    exit()
+_env = None
+_source_loader = None
+# Extra Environment options, set before the first template_env() call
+env_options = {}
 
-env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
+def template_env():
+    """The Jinja environment, created (and Jinja imported) on first use"""
+    global _env, _source_loader
+    if _env is None:
+        from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+
+        if not os.path.exists(TEMPLATE_DIR):
+            print(f"❌ Error: '{TEMPLATE_DIR}' folder မရှိပါ။")
+            exit()
+
+        class AssetExtractingLoader(FileSystemLoader):
+            def get_source(self, environment, template):
+                source, filename, uptodate = super().get_source(environment, template)
+                return template_assets.process(source), filename, uptodate
+
+        # Bytecode is keyed by each template's (rewritten) source, so a stale
+        # entry is never used; it only saves re-compiling unchanged templates
+        os.makedirs(TEMPLATE_BYTECODE_DIR, exist_ok=True)
+        _source_loader = AssetExtractingLoader(TEMPLATE_DIR)
+        _env = Environment(loader=_source_loader, bytecode_cache=FileSystemBytecodeCache(TEMPLATE_BYTECODE_DIR), **env_options)
+    return _env
+
+def reset_templates(link_rewrites=None):
+    """Forget compiled templates and extracted assets, e.g. between watch-mode builds"""
+    if _env is not None:
+        _env.loader = _source_loader
+        _env.cache.clear()
+    template_assets.assets = {}
+    template_assets.link_rewrites = link_rewrites or {}
+
+def extract_template_assets(names):
+    """Collect the assets of the given templates straight from their
+    sources, as loading them would, without importing Jinja"""
+    for name in names:
+        with open(os.path.join(TEMPLATE_DIR, name), 'r', encoding='utf-8') as f:
+            template_assets.process(f.read())
+
+def template_source_hashes():
+    sources = {}
+    for name in sorted(os.listdir(TEMPLATE_DIR)):
+        with open(os.path.join(TEMPLATE_DIR, name), 'rb') as f:
+            sources[name] = hashlib.sha256(f.read()).hexdigest()
+    return sources
+
+def compiled_templates_key():
+    """What the precompiled modules depend on: every template source, the
+    current link rewrites and the compiler"""
+    import jinja2
+    return data_hash({
+        'templates': template_source_hashes(),
+        'links': template_assets.link_rewrites,
+        'jinja': jinja2.__version__,
+        'asset_pipeline': ASSET_PIPELINE_VERSION,
+    })
+
+def compile_templates():
+    """Compile every template into an importable module under
+    COMPILED_TEMPLATE_DIR, for later builds to load without parsing"""
+    tmp_dir = COMPILED_TEMPLATE_DIR + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    # Collect just the assets the templates themselves produce
+    assets = template_assets.assets
+    template_assets.assets = {}
+    try:
+        template_env().compile_templates(tmp_dir, zip=None, ignore_errors=False, log_function=None)
+        extracted = template_assets.assets
+    finally:
+        template_assets.assets = {**assets, **template_assets.assets}
+    with open(os.path.join(tmp_dir, COMPILED_TEMPLATE_INFO), 'w', encoding='utf-8') as f:
+        json.dump({'key': compiled_templates_key(), 'assets': extracted}, f, ensure_ascii=False)
+    shutil.rmtree(COMPILED_TEMPLATE_DIR, ignore_errors=True)
+    os.replace(tmp_dir, COMPILED_TEMPLATE_DIR)
+    print(f"   Precompiled {len(os.listdir(TEMPLATE_DIR))} template(s) into '{COMPILED_TEMPLATE_DIR}'")
+
+def use_compiled_templates():
+    """Switch to the precompiled templates if they match the current sources
+    and link rewrites, adding the assets their sources would have produced;
+    the source loader stays in use otherwise"""
+    from jinja2 import ModuleLoader
+    try:
+        with open(os.path.join(COMPILED_TEMPLATE_DIR, COMPILED_TEMPLATE_INFO), 'r', encoding='utf-8') as f:
+            info = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if info.get('key') != compiled_templates_key():
+        print("   Precompiled templates are out of date (rerun with --precompile-templates); using the sources")
+        return False
+    env = template_env()
+    env.loader = ModuleLoader(COMPILED_TEMPLATE_DIR)
+    env.cache.clear()
+    template_assets.assets.update(info['assets'])
+    return True
 
 def clean_and_create_dir(path):
     print(f"   Using output directory: {path}")
@@ -35,149 +283,2277 @@ def clean_and_create_dir(path):
             
     os.makedirs(path)
     os.makedirs(os.path.join(path, 'css'))
-    os.makedirs(os.path.join(path, 'images'))
+
+# --- BUILD MANIFEST ---
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def data_hash(data):
+    """Stable digest of any JSON-serialisable value"""
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+_installed = None
+
+def installed_fact(module, name, compute):
+    """compute(), remembered in INSTALLED_CACHE for as long as the installed
+    copy of `module` is unchanged (same path, size and mtime), so builds
+    need not import it, or importlib.metadata, just to ask.
+    Raises ImportError when `module` is not installed."""
+    global _installed
+    spec = importlib.util.find_spec(module)
+    if spec is None or spec.origin is None:
+        raise ImportError(f"No module named '{module}'")
+    st = os.stat(spec.origin)
+    key = [spec.origin, st.st_size, st.st_mtime_ns]
+    if _installed is None:
+        try:
+            with open(INSTALLED_CACHE, 'r', encoding='utf-8') as f:
+                _installed = json.load(f)
+        except (OSError, ValueError):
+            _installed = {}
+    entry = _installed.get(module)
+    if entry is None or entry['key'] != key:
+        entry = _installed[module] = {'key': key, 'facts': {}}
+    if name not in entry['facts']:
+        entry['facts'][name] = compute()
+        os.makedirs(BUILD_CACHE_DIR, exist_ok=True)
+        with open(INSTALLED_CACHE + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(_installed, f, sort_keys=True)
+        os.replace(INSTALLED_CACHE + '.tmp', INSTALLED_CACHE)
+    return entry['facts'][name]
+
+def _markdown_dist_version():
+    import importlib.metadata
+    return importlib.metadata.version('Markdown')
+
+def markdown_version():
+    """Markdown's installed version, from its package metadata: importing the
+    package loads the whole converter, which a no-op build never needs"""
+    return installed_fact('markdown', 'version', _markdown_dist_version)
+
+def build_config():
+    """Settings that change the rendered output of every page"""
+    return {
+        'base_url': BASE_URL,
+        'domain_name': DOMAIN_NAME,
+        'posts_per_page': POSTS_PER_PAGE,
+        'stable_pagination': STABLE_PAGINATION,
+        'markdown_extensions': MARKDOWN_EXTENSIONS,
+        'markdown_version': markdown_version(),
+        'pygments_version': pygments.__version__,
+        'asset_pipeline': ASSET_PIPELINE_VERSION,
+    }
+
+_TEMPLATE_REF_RE = re.compile(r'{%-?\s*(?:extends|include|import|from)\s+["\']([^"\']+)["\']')
+
+def template_hashes(name, seen=None):
+    """Hash `name` and every template it extends/includes, transitively"""
+    seen = {} if seen is None else seen
+    if name in seen:
+        return seen
+    path = os.path.join(TEMPLATE_DIR, name)
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    seen[name] = hashlib.sha256(source.encode('utf-8')).hexdigest()
+    for ref in _TEMPLATE_REF_RE.findall(source):
+        template_hashes(ref, seen)
+    return seen
+
+class BuildManifest:
+    """Records the inputs (sources, templates, config) behind every output file.
+
+    An output whose recorded inputs are unchanged, and which still exists on
+    disk, is skipped so the file stays byte-identical between builds.
+    """
+
+    def __init__(self, path=MANIFEST_PATH, force=False):
+        self.path = path
+        self.force = force
+        self.previous = {}
+        self.current = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                self.previous = data.get('outputs', {})
+        except (OSError, ValueError):
+            pass
+
+    def add(self, relpath, record):
+        """Record that this build produces `relpath` from the given inputs"""
+        self.current[relpath] = record
+
+    def is_fresh(self, relpath, record):
+        """True when `relpath` was built from exactly these inputs already;
+        records that this build produces it either way"""
+        self.add(relpath, record)
+        return self.was_built(relpath, record)
+
+    def was_built(self, relpath, record):
+        """is_fresh() without recording `relpath` as an output of this build"""
+        if self.force or self.previous.get(relpath) != record:
+            return False
+        return os.path.exists(os.path.join(OUTPUT_DIR, relpath))
+
+    def stale_outputs(self):
+        """Outputs from the previous build that this build no longer produces"""
+        return [p for p in self.previous if p not in self.current]
+
+    def save(self):
+        if self.current == self.previous:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'outputs': self.current}, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+# --- STAGING & PUBLISH ---
+def _move_into_place(src, dst):
+    """Atomically replace dst with src, copying first if they are on different filesystems"""
+    os.makedirs(os.path.dirname(dst) or '.', exist_ok=True)
+    try:
+        os.replace(src, dst)
+    except OSError:
+        tmp_path = os.path.join(os.path.dirname(dst) or '.', f".{os.path.basename(dst)}.tmp")
+        shutil.copy2(src, tmp_path)
+        os.replace(tmp_path, dst)
+
+def _walk_files(root):
+    # Slicing off the root is the same as os.path.relpath(), which costs an
+    # abspath() per file
+    prefix = os.path.join(root, '')
+    for dirpath, _, filenames in os.walk(root):
+        rel_dir = dirpath[len(prefix):]
+        for name in filenames:
+            yield os.path.join(rel_dir, name), os.path.join(dirpath, name)
+
+def publish_staging(manifest, clean=False):
+    """Sync the staging directory into the live output directory.
+
+    Only files whose bytes differ are moved in (one atomic rename each), so
+    readers never see a half-written page and unchanged files keep their
+    mtimes. Outputs the manifest no longer knows about, and RETIRED_OUTPUTS,
+    are removed; with `clean` every live file that was not produced by this
+    build is removed.
+    """
+    print(f"   Publishing changes to '{OUTPUT_DIR}/'...")
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    staged = set()
+    updated = 0
+    for relpath, src in _walk_files(STAGING_DIR):
+        staged.add(relpath)
+        dst = os.path.join(OUTPUT_DIR, relpath)
+        if os.path.isfile(dst) and filecmp.cmp(src, dst, shallow=False):
+            continue
+        _move_into_place(src, dst)
+        updated += 1
+
+    if clean:
+        stale = [rel for rel, _ in _walk_files(OUTPUT_DIR) if rel not in staged and rel not in manifest.current]
+    else:
+        stale = manifest.stale_outputs()
+    stale += [rel for rel in RETIRED_OUTPUTS if rel not in stale and rel not in staged]
+    for relpath in stale:
+        path = os.path.join(OUTPUT_DIR, relpath)
+        if os.path.exists(path):
+            print(f"   Removing stale output: {relpath}")
+            os.remove(path)
+
+    shutil.rmtree(STAGING_DIR, ignore_errors=True)
+    print(f"   Published {updated} changed file(s), {len(staged) - updated} identical.")
+
+# --- IMAGE SYNC ---
+# Linux FICLONE ioctl: share the source's blocks (btrfs, XFS) instead of copying
+_FICLONE = 0x40049409
+
+def _reflink(src, dst):
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        except OSError:
+            return False
+    shutil.copystat(src, dst)
+    return True
+
+def _link_or_copy(src, dst):
+    """Put a copy of src at dst atomically; returns how it was done.
+
+    A hard link costs nothing when both live on the same filesystem, then a
+    reflink, and only then a real byte copy.
+    """
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    tmp_path = os.path.join(os.path.dirname(dst), f".{os.path.basename(dst)}.tmp")
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.link(src, tmp_path)
+        method = 'linked'
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.EPERM, errno.EACCES, errno.EMLINK, errno.ENOTSUP):
+            raise
+        if _reflink(src, tmp_path):
+            method = 'reflinked'
+        else:
+            shutil.copy2(src, tmp_path)
+            method = 'copied'
+    os.replace(tmp_path, dst)
+    return method
+
+def _image_is_current(src, src_stat, dst, verify_hash):
+    try:
+        dst_stat = os.stat(dst)
+    except FileNotFoundError:
+        return False
+    if os.path.samestat(src_stat, dst_stat):
+        return True
+    if src_stat.st_size != dst_stat.st_size:
+        return False
+    if src_stat.st_mtime_ns == dst_stat.st_mtime_ns:
+        return True
+    # Same size, different mtime (e.g. after a fresh git checkout): only the
+    # bytes can tell, and matching bytes just need their timestamp synced
+    if verify_hash and file_hash(src) == file_hash(dst):
+        os.utime(dst, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        return True
+    return False
+
+def sync_images(manifest, verify_hash=False):
+    """Mirror content/images into the live output, touching only what changed.
+
+    An output is up to date when it is the same file as its source, or has
+    the same size and mtime (with `verify_hash`, the same bytes). New or
+    changed images are hard-linked, reflinked or copied in with an atomic
+    rename; outputs whose source is gone are removed.
+    """
+    src_root = os.path.join(CONTENT_DIR, 'images')
+    dst_root = os.path.join(OUTPUT_DIR, 'images')
+    if not os.path.isdir(src_root):
+        return
+    started = time.perf_counter()
+    counts = {'linked': 0, 'reflinked': 0, 'copied': 0, 'unchanged': 0}
+    sources = set()
+    for rel, src in _walk_files(src_root):
+        sources.add(rel)
+        src_stat = os.stat(src)
+        dst = os.path.join(dst_root, rel)
+        manifest.add(os.path.join('images', rel), {'size': src_stat.st_size, 'mtime_ns': src_stat.st_mtime_ns})
+        if _image_is_current(src, src_stat, dst, verify_hash):
+            counts['unchanged'] += 1
+        else:
+            counts[_link_or_copy(src, dst)] += 1
+
+    removed = 0
+    if os.path.isdir(dst_root):
+        for rel, dst in list(_walk_files(dst_root)):
+            if rel not in sources:
+                print(f"   Removing stale image: {rel}")
+                os.remove(dst)
+                removed += 1
+
+    elapsed = time.perf_counter() - started
+    print(f"   Images: {counts['linked']} linked, {counts['reflinked']} reflinked, {counts['copied']} copied, "
+          f"{counts['unchanged']} unchanged, {removed} removed in {elapsed * 1000:.0f}ms")
+
+# --- IMAGE VARIANTS ---
+def _pillow_encoders():
+    from PIL import Image, features
+    formats = ['avif', 'webp', 'jpeg'] if features.check('avif') else ['webp', 'jpeg']
+    return {'formats': formats, 'pillow': Image.__version__}
+
+def image_settings():
+    """Settings that change the bytes of every generated variant; Pillow is
+    only imported when it has changed since it was last asked"""
+    encoders = installed_fact('PIL', 'encoders', _pillow_encoders)
+    return {'widths': IMAGE_WIDTHS, 'quality': IMAGE_QUALITY, **encoders}
+
+def variant_widths(width):
+    """Target widths for a source `width` pixels wide, never upscaling"""
+    widths = [w for w in IMAGE_WIDTHS if w < width]
+    widths.append(min(width, IMAGE_WIDTHS[-1]))
+    return sorted(set(widths))
+
+def _render_variants(src, cache_dir, settings):
+    """Write every variant of one image into cache_dir; returns its metadata,
+    or None when Pillow cannot read it (the original still ships as is)"""
+    from PIL import Image, UnidentifiedImageError
+    try:
+        return _encode_variants(src, cache_dir, settings)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        print(f"   ⚠️ Could not make variants of {src}: {e}")
+        shutil.rmtree(cache_dir + '.tmp', ignore_errors=True)
+        return None
+
+def _encode_variants(src, cache_dir, settings):
+    from PIL import Image, ImageOps
+    with Image.open(src) as im:
+        im = ImageOps.exif_transpose(im)
+        width, height = im.size
+        has_alpha = im.mode in ('RGBA', 'LA') or (im.mode == 'P' and 'transparency' in im.info)
+        im = im.convert('RGBA' if has_alpha else 'RGB')
+        tmp_dir = cache_dir + '.tmp'
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        variants = []
+        for w in variant_widths(width):
+            h = max(1, round(height * w / width))
+            resized = im if w == width else im.resize((w, h), Image.LANCZOS)
+            for fmt in settings['formats']:
+                out = resized
+                if fmt == 'jpeg' and has_alpha:
+                    out = Image.new('RGB', resized.size, (255, 255, 255))
+                    out.paste(resized, mask=resized.getchannel('A'))
+                name = f"{w}.{'jpg' if fmt == 'jpeg' else fmt}"
+                out.save(os.path.join(tmp_dir, name), fmt.upper(), quality=settings['quality'][fmt], optimize=fmt == 'jpeg')
+                variants.append({'file': name, 'format': fmt, 'width': w, 'height': h})
+    meta = {'width': width, 'height': height, 'variants': variants}
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(tmp_dir, cache_dir)
+    return meta
+
+def _load_cached_variants(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, 'meta.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+class ImageHashIndex:
+    """Remembers each source image's hash against its size and mtime, so
+    unchanged originals are not re-read on every build."""
+
+    def __init__(self, path=os.path.join(IMAGE_CACHE_DIR, 'hashes.json')):
+        self.path = path
+        self.entries = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def hash(self, rel, path):
+        st = os.stat(path)
+        entry = self.entries.get(rel)
+        if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+            return entry['sha256']
+        digest = file_hash(path)
+        self.entries[rel] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': digest}
+        return digest
+
+    def save(self, keep):
+        self.entries = {rel: e for rel, e in self.entries.items() if rel in keep}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+def optimize_images(jobs=1):
+    """Generate width-bounded AVIF/WebP/JPEG variants of content/images.
+
+    Variants are cached under .build/images by source hash and settings, so
+    only new or edited originals are re-encoded (across a process pool), and
+    entries no current original uses are pruned. Returns a map from the
+    source path as written in Markdown (`images/<name>.<src-ext>`) to its
+    dimensions and variants, each to be published as
+    `img/<name>-<src-ext>-<width>.<ext>` by publish_image_variants().
+    """
+    src_root = os.path.join(CONTENT_DIR, 'images')
+    if not os.path.isdir(src_root):
+        return {}
+    try:
+        settings = image_settings()
+    except ImportError:
+        print("   ⚠️ Pillow is not installed; skipping responsive image variants.")
+        return {}
+    started = time.perf_counter()
+    settings_hash = data_hash(settings)
+    hashes = ImageHashIndex()
+
+    sources = {}
+    for rel, src in _walk_files(src_root):
+        if rel.lower().endswith(IMAGE_EXTENSIONS):
+            key = data_hash({'source': hashes.hash(rel, src), 'settings': settings_hash})
+            sources[rel] = (src, os.path.join(IMAGE_CACHE_DIR, key))
+
+    metas = {rel: _load_cached_variants(cache_dir) for rel, (_, cache_dir) in sources.items()}
+    todo = [rel for rel, meta in metas.items() if meta is None]
+    if todo:
+        args = [(sources[rel][0], sources[rel][1], settings) for rel in todo]
+        if jobs > 1 and len(todo) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=min(jobs, len(todo))) as pool:
+                results = list(pool.map(_render_variants, *zip(*args)))
+        else:
+            results = [_render_variants(*a) for a in args]
+        metas.update(zip(todo, results))
+    hashes.save(keep=sources)
+    pruned = _prune_variant_cache({os.path.basename(cache_dir) for _, cache_dir in sources.values()})
+
+    catalog = {}
+    for rel, meta in metas.items():
+        if meta is None:
+            continue
+        # foo.jpg and foo.png must not publish over each other's variants
+        stem, ext = os.path.splitext(rel.replace(os.sep, '/'))
+        stem = f"{stem}-{ext[1:]}"
+        cache_dir = sources[rel][1]
+        catalog['images/' + rel.replace(os.sep, '/')] = {
+            'width': meta['width'],
+            'height': meta['height'],
+            'variants': [dict(v, url=f"{IMAGE_VARIANT_DIR}/{stem}-{v['file']}", cache=os.path.join(cache_dir, v['file']))
+                         for v in meta['variants']],
+        }
+
+    elapsed = time.perf_counter() - started
+    unreadable = len(sources) - len(catalog)
+    print(f"   Image variants: {len(todo) - unreadable} of {len(sources)} image(s) encoded, "
+          f"{unreadable} unreadable, {pruned} stale pruned in {elapsed:.2f}s")
+    return catalog
+
+def _prune_variant_cache(keep):
+    """Delete cached variant sets (and interrupted .tmp ones) not in `keep`"""
+    removed = 0
+    for entry in os.scandir(IMAGE_CACHE_DIR):
+        if entry.is_dir() and entry.name not in keep:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed += 1
+    return removed
+
+def publish_image_variants(manifest, catalog):
+    """Link the cached variants into docs/img/ and drop ones no longer produced"""
+    published = set()
+    for info in catalog.values():
+        for v in info['variants']:
+            relpath = os.path.normpath(v['url'])
+            published.add(relpath)
+            manifest.add(relpath, {'variant': v['cache'][len(os.path.join(IMAGE_CACHE_DIR, '')):]})
+            dst = os.path.join(OUTPUT_DIR, relpath)
+            if not _image_is_current(v['cache'], os.stat(v['cache']), dst, verify_hash=False):
+                _link_or_copy(v['cache'], dst)
+    for rel, dst in list(_walk_files(os.path.join(OUTPUT_DIR, IMAGE_VARIANT_DIR))):
+        if os.path.join(IMAGE_VARIANT_DIR, rel) not in published:
+            os.remove(dst)
+
+def largest_variant(info, fmt='jpeg'):
+    candidates = [v for v in info['variants'] if v['format'] == fmt]
+    return max(candidates, key=lambda v: v['width']) if candidates else None
+
+# --- RESPONSIVE MARKUP ---
+# A whole <img> tag; quoted attribute values may contain '>'
+_IMG_TAG_RE = re.compile(r'''<img\b(?:[^>"']|"[^"]*"|'[^']*')*>''', re.IGNORECASE)
+_TAG_CLOSE_RE = re.compile(r'\s*/?>$')
+LAZY_IMAGE_ATTRS = {'loading': 'lazy', 'decoding': 'async'}
+
+class _StartTagParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.attrs = []
+
+    def handle_starttag(self, tag, attrs):
+        self.attrs = attrs
+
+def tag_attrs(tag):
+    """Attributes of a single start tag, in order and unescaped: quoted,
+    unquoted or bare (a bare boolean attribute's value is None)"""
+    parser = _StartTagParser()
+    parser.feed(tag)
+    parser.close()
+    return dict(parser.attrs)
+
+def _escape_attr(value):
+    # As Markdown escapes attribute values, so untouched values keep their bytes
+    return htmllib.escape(value, quote=False).replace('"', '&quot;')
+
+def _format_attrs(attrs):
+    return ' '.join(k if v is None else f'{k}="{_escape_attr(v)}"' for k, v in attrs.items())
+
+def _srcset(variants, fmt):
+    return ', '.join(f"{quote(v['url'])} {v['width']}w" for v in variants if v['format'] == fmt)
+
+def responsive_images(html, catalog):
+    """Rewrite the <img> tags Markdown produced into <picture> elements.
+
+    Images with generated variants get AVIF/WebP <source>s, a JPEG srcset
+    and intrinsic width/height; other tags are kept as written. Every image
+    but the first (the likely LCP element) is lazy-loaded.
+    """
+    seen_first = []
+
+    def rewrite(match):
+        tag = match.group(0)
+        attrs = tag_attrs(tag)
+        lazy = {k: v for k, v in LAZY_IMAGE_ATTRS.items() if k not in attrs} if seen_first else {}
+        seen_first.append(True)
+        info = catalog.get(attrs.get('src') or '')
+        fallback = largest_variant(info) if info else None
+        if not fallback:
+            if not lazy:
+                return tag
+            close = _TAG_CLOSE_RE.search(tag)
+            return f'{tag[:close.start()]} {_format_attrs(lazy)}{close.group(0)}'
+        attrs.update(lazy)
+        attrs.update({
+            'src': quote(fallback['url']),
+            'srcset': _srcset(info['variants'], 'jpeg'),
+            'sizes': IMAGE_SIZES,
+            'width': str(fallback['width']),
+            'height': str(fallback['height']),
+        })
+        sources = ''.join(f'<source type="image/{fmt}" srcset="{_srcset(info["variants"], fmt)}" sizes="{IMAGE_SIZES}">'
+                          for fmt in ('avif', 'webp') if any(v['format'] == fmt for v in info['variants']))
+        return f'<picture>{sources}<img {_format_attrs(attrs)} /></picture>'
+
+    return _IMG_TAG_RE.sub(rewrite, html)
 
 def create_cname_file():
     """Create CNAME file for GitHub Pages Custom Domain"""
     print(f"   Creating CNAME file for {DOMAIN_NAME}...")
-    with open(os.path.join(OUTPUT_DIR, 'CNAME'), 'w') as f:
+    with open(os.path.join(STAGING_DIR, 'CNAME'), 'w') as f:
         f.write(DOMAIN_NAME)
 
-def generate_css_syntax_highlighting():
+def syntax_css():
+    from pygments.formatters import HtmlFormatter
+    return HtmlFormatter(style=HIGHLIGHT_STYLE).get_style_defs('.codehilite')
+
+def generate_css_syntax_highlighting(manifest):
+    relpath = os.path.join('css', 'syntax.css')
+    # Only the style and Pygments itself change it; skipping it when fresh
+    # keeps Pygments' formatters (and their plugin scan) out of no-op builds
+    if manifest.is_fresh(relpath, {'style': HIGHLIGHT_STYLE, 'pygments': pygments.__version__}):
+        return
     print("   Generating Syntax Highlighter CSS...")
-    formatter = HtmlFormatter(style='monokai')
-    css_content = formatter.get_style_defs('.codehilite')
-    with open(os.path.join(OUTPUT_DIR, 'css', 'syntax.css'), 'w') as f:
-        f.write(css_content)
+    with open(os.path.join(STAGING_DIR, relpath), 'w') as f:
+        f.write(syntax_css())
+
+# --- RENDER CACHE ---
+class RenderCache:
+    """Content-addressed store of converted Markdown on disk.
+
+    Entries are keyed by the source text and everything that changes how it
+    converts (extensions, Markdown and Pygments versions, highlight style),
+    so a hit can never be stale. Hits refresh the entry's mtime, and
+    evict() drops the least recently used entries beyond `max_bytes`.
+    """
+    label = "Render cache"
+
+    def __init__(self, path=RENDER_CACHE_DIR, max_bytes=RENDER_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.settings_hash = data_hash({
+            'markdown_extensions': MARKDOWN_EXTENSIONS,
+            'markdown_version': markdown_version(),
+            'pygments_version': pygments.__version__,
+            'highlight_style': HIGHLIGHT_STYLE,
+        })
+
+    def _entry_path(self, text):
+        key = hashlib.sha256((self.settings_hash + text).encode('utf-8')).hexdigest()
+        return os.path.join(self.path, key[:2], key + '.json')
+
+    def get(self, text):
+        path = self._entry_path(text)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, text, entry):
+        path = self._entry_path(text)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for _, path in _walk_files(self.path):
+            st = os.stat(path)
+            entries.append((st.st_mtime_ns, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        if removed:
+            print(f"   {self.label}: evicted {removed} old entr{'y' if removed == 1 else 'ies'}")
+
+class HighlightCache(RenderCache):
+    """Highlighted HTML of single code blocks, so a block that is unchanged,
+    or repeated in another post, is not lexed again when the post around it
+    is reconverted. Shared by worker processes through the same store; each
+    process counts its own hits and misses.
+    """
+    label = "Highlight cache"
+
+    def __init__(self, path=HIGHLIGHT_CACHE_DIR, max_bytes=HIGHLIGHT_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.settings_hash = data_hash({
+            'markdown_version': markdown_version(),
+            'pygments_version': pygments.__version__,
+            'highlight_style': HIGHLIGHT_STYLE,
+        })
+        self.hits = 0
+        self.misses = 0
+
+    def highlight(self, block, hilite, shebang):
+        """`hilite(block, shebang)` (CodeHilite.hilite), or its cached result;
+        the key is everything that method reads: language, code and options"""
+        key = data_hash({'block': vars(block), 'shebang': shebang})
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached['html']
+        self.misses += 1
+        html = hilite(block, shebang)
+        self.put(key, {'html': html})
+        return html
+
+    def take_counts(self):
+        """(hits, misses) since the last call"""
+        counts = (self.hits, self.misses)
+        self.hits = self.misses = 0
+        return counts
+
+# Both fenced_code and codehilite highlight through CodeHilite.hilite(), so
+# wrapping that one method covers every code block in this process
+_highlight_cache = None
 
-def parse_markdown_posts():
-    print("   Parsing Markdown files...")
-    posts = []
-    md = markdown.Markdown(extensions=['meta', 'fenced_code', 'codehilite'])
+def use_highlight_cache(cache):
+    """Route this process's code highlighting through `cache` (None to stop)"""
+    global _highlight_cache
+    from markdown.extensions.codehilite import CodeHilite
+    if cache is not None and not getattr(CodeHilite.hilite, 'cached', False):
+        uncached = CodeHilite.hilite
 
+        def hilite(self, shebang=True):
+            if _highlight_cache is None:
+                return uncached(self, shebang)
+            return _highlight_cache.highlight(self, uncached, shebang)
+
+        hilite.cached = True
+        CodeHilite.hilite = hilite
+    _highlight_cache = cache
+
+# --- FRONT MATTER ---
+# The same header syntax the Markdown `meta` extension reads
+_META_RE = re.compile(r'^[ ]{0,3}(?P<key>[A-Za-z0-9_-]+):\s*(?P<value>.*)')
+_META_MORE_RE = re.compile(r'^[ ]{4,}(?P<value>.*)')
+_META_BEGIN_RE = re.compile(r'^-{3}(\s.*)?')
+_META_END_RE = re.compile(r'^(-{3}|\.{3})(\s.*)?')
+# Markdown images, for the variants a post depends on (inline-HTML images
+# are found with _IMG_TAG_RE)
+_MD_IMAGE_RE = re.compile(r'''!\[[^\]]*\]\(\s*<?([^)>"']+?)>?(?:\s+(?:"[^"]*"|'[^']*'|\([^)]*\)))?\s*\)''')
+
+def read_front_matter(text):
+    """The first value of each header key, as md.Meta would give it, read
+    without converting the rest of the document"""
+    lines = text.replace('\r\n', '\n').replace('\r', '\n').expandtabs(4).split('\n')
+    meta = {}
+    key = None
+    if lines and _META_BEGIN_RE.match(lines[0]):
+        lines.pop(0)
+    for line in lines:
+        if line.strip() == '' or _META_END_RE.match(line):
+            break
+        m1 = _META_RE.match(line)
+        if m1:
+            key = m1.group('key').lower().strip()
+            meta.setdefault(key, m1.group('value').strip())
+            continue
+        if not (_META_MORE_RE.match(line) and key):
+            break
+    return meta
+
+class Post:
+    """A post's listing record, as read from its front matter.
+
+    Slotted, so a large archive costs a few small objects per post and the
+    records pickle cheaply; the URLs are derived on access rather than
+    stored. `meta` stays a dict so templates keep `post.meta.title` and
+    see any extra front-matter keys. `html` is only set while a page is
+    being rendered (see stream_posts) or by the preview server.
+    """
+    __slots__ = ('filename', 'source_hash', 'meta', 'date', 'read_time',
+                 'word_count', 'images', 'og_image', 'html')
+
+    def __init__(self, filename, source_hash, meta, date, read_time, word_count, images):
+        self.filename = filename
+        self.source_hash = source_hash
+        self.meta = meta
+        self.date = date
+        self.read_time = read_time
+        self.word_count = word_count
+        self.images = images
+        self.og_image = None
+        self.html = None
+
+    @property
+    def slug(self):
+        return self.filename.replace('.md', '.html')
+
+    @property
+    def full_url(self):
+        return f"{BASE_URL}/{self.slug}"
+
+    @property
+    def full_image_url(self):
+        return f"{BASE_URL}/{self.og_image or self.meta['image']}"
+
+    def with_html(self, html):
+        """A copy of this record carrying the converted body"""
+        post = copy.copy(self)
+        post.html = html
+        return post
+
+def parse_date(filename, value):
+    """The day a post's `date` header names; a time after it is ignored
+
+    >>> parse_date('a.md', '2025-12-25')
+    datetime.date(2025, 12, 25)
+    >>> parse_date('a.md', '2025-12-25 10:30')
+    datetime.date(2025, 12, 25)
+    >>> parse_date('a.md', '2025-12-25 10:30 AM')
+    datetime.date(2025, 12, 25)
+    """
+    value = value.strip()
+    try:
+        return datetime.datetime.fromisoformat(value).date()
+    except ValueError:
+        pass
+    try:
+        return datetime.date.fromisoformat(value[:10])
+    except ValueError:
+        print(f"   ⚠️ {filename}: date '{value}' is not YYYY-MM-DD, listing it last")
+        return datetime.date.min
+
+def scan_post_file(filename, images=None, word_counts=None):
+    """Build a post's listing record (meta, read time, referenced images)
+    from its front matter, without converting the body"""
+    filepath = os.path.join(CONTENT_DIR, filename)
+    with open(filepath, 'r', encoding='utf-8') as f:
+        text = f.read()
+    meta = read_front_matter(text)
+
+    source_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    # Burmese has no spaces between words; count it by syllables
+    word_count = word_counts.get(source_hash) if word_counts is not None else None
+    if word_count is None:
+        word_count = myanmar.word_count(text)
+    read_time = round(word_count / 200)
+    read_time = 1 if read_time < 1 else read_time
+    
+    if 'title' not in meta: meta['title'] = filename.replace('.md', '')
+    if 'summary' not in meta: meta['summary'] = "No summary provided."
+    if 'date' not in meta: meta['date'] = '2025-01-01'
+    
+    # Cover Image Logic
+    if 'image' not in meta:
+        meta['image'] = 'images/default-cover.jpg'
+
+    images = images or {}
+    referenced = {htmllib.unescape(src.strip()) for src in _MD_IMAGE_RE.findall(text)}
+    referenced.update(tag_attrs(tag).get('src') or '' for tag in _IMG_TAG_RE.findall(text))
+    
+    return Post(
+        filename=filename,
+        source_hash=source_hash,
+        meta=meta,
+        date=parse_date(filename, meta['date']),
+        read_time=read_time,
+        word_count=word_count,
+        images={src: data_hash(images[src]) for src in sorted(referenced) if src in images},
+    )
+
+def scan_posts(images=None):
+    """Listing records for every post, newest first, without converting any"""
     if not os.path.exists(CONTENT_DIR):
         print(f"❌ Error: '{CONTENT_DIR}' folder မရှိပါ။")
         return []
 
-    files = [f for f in os.listdir(CONTENT_DIR) if f.endswith(".md")]
-
-    for filename in files:
-        filepath = os.path.join(CONTENT_DIR, filename)
-        with open(filepath, 'r', encoding='utf-8') as f:
-            text = f.read()
-            html = md.convert(text)
-            
-            word_count = len(text.split())
-            read_time = round(word_count / 200)
-            read_time = 1 if read_time < 1 else read_time
-            
-            if hasattr(md, 'Meta'):
-                meta = {k: v[0] for k, v in md.Meta.items()}
-            else:
-                meta = {}
-            
-            if 'title' not in meta: meta['title'] = filename.replace('.md', '')
-            if 'summary' not in meta: meta['summary'] = "No summary provided."
-            if 'date' not in meta: meta['date'] = '2025-01-01'
-            
-            # Cover Image Logic
-            if 'image' not in meta:
-                meta['image'] = 'images/default-cover.jpg'
-            
-            # Full URL construction
-            full_image_url = f"{BASE_URL}/{meta['image']}"
-            slug = filename.replace('.md', '.html')
-            full_url = f"{BASE_URL}/{slug}"
-            
-            posts.append({
-                'slug': slug,
-                'html': html,
-                'meta': meta,
-                'filename': filename,
-                'read_time': read_time,
-                'full_image_url': full_image_url,
-                'full_url': full_url
-            })
-            md.reset() 
-    
-    posts.sort(key=lambda x: x['meta']['date'], reverse=True)
+    # Sorted so that posts sharing a date always come out in the same order
+    files = sorted(f for f in os.listdir(CONTENT_DIR) if f.endswith(".md"))
+    word_counts = load_word_counts()
+    posts = [scan_post_file(filename, images, word_counts) for filename in files]
+    posts.sort(key=lambda x: x.date, reverse=True)
+    counts = {p.source_hash: p.word_count for p in posts}
+    if counts != word_counts:
+        save_word_counts(counts)
     return posts
 
-def build():
+def load_word_counts():
+    """Word counts by source hash from the last scan; segmenting the whole
+    corpus is the slowest part of scanning it"""
+    try:
+        with open(WORD_COUNT_CACHE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data['counts'] if data.get('version') == myanmar.VERSION else {}
+
+def save_word_counts(counts):
+    os.makedirs(os.path.dirname(WORD_COUNT_CACHE), exist_ok=True)
+    tmp_path = WORD_COUNT_CACHE + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': myanmar.VERSION, 'counts': counts}, f, sort_keys=True)
+    os.replace(tmp_path, WORD_COUNT_CACHE)
+
+# --- CONVERSION ---
+def convert_markdown(text, md):
+    try:
+        return md.convert(text)
+    finally:
+        md.reset()
+
+def convert_post_file(filename, md, images=None, cache=None):
+    """Full Markdown conversion of one post, with responsive image markup"""
+    filepath = os.path.join(CONTENT_DIR, filename)
+    with open(filepath, 'r', encoding='utf-8') as f:
+        text = f.read()
+    cached = cache.get(text) if cache else None
+    if cached is None:
+        html = convert_markdown(text, md)
+        if cache:
+            cache.put(text, {'html': html})
+    else:
+        html = cached['html']
+    return responsive_images(html, images or {})
+
+# One Markdown instance per worker process, created by the pool initializer
+_worker_md = None
+_worker_images = None
+_worker_cache = None
+
+def _init_convert_worker(images, cache, highlights):
+    global _worker_md, _worker_images, _worker_cache
+    import markdown
+    _worker_md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+    _worker_images = images
+    _worker_cache = cache
+    use_highlight_cache(highlights)
+
+def _convert_in_worker(filename):
+    html = convert_post_file(filename, _worker_md, _worker_images, _worker_cache)
+    return html, _highlight_cache.take_counts() if _highlight_cache else (0, 0)
+
+def default_jobs():
+    return os.cpu_count() or 1
+
+def stream_posts(posts, jobs=1, images=None, cache=None, highlights=None):
+    """Yield (post, html) for the given posts, in order, converting at most a
+    couple of posts per worker ahead of the consumer, so only that many
+    bodies are ever held in memory at once. Workers' highlight cache hits
+    and misses are added to `highlights`."""
+    files = [post.filename for post in posts]
+    jobs = max(1, min(jobs, len(files)))
+    if not files:
+        return
+
+    if jobs > 1:
+        print(f"   Converting {len(files)} Markdown file(s) ({jobs} workers)...")
+        from concurrent.futures import ProcessPoolExecutor
+        initargs = (images, cache, highlights)
+
+        def result(future):
+            html, (hits, misses) = future.result()
+            if highlights:
+                highlights.hits += hits
+                highlights.misses += misses
+            return html
+
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_convert_worker, initargs=initargs) as pool:
+            pending = deque()
+            for post in posts:
+                pending.append((post, pool.submit(_convert_in_worker, post.filename)))
+                if len(pending) >= jobs * 2:
+                    post, future = pending.popleft()
+                    yield post, result(future)
+            while pending:
+                post, future = pending.popleft()
+                yield post, result(future)
+    else:
+        print(f"   Converting {len(files)} Markdown file(s)...")
+        import markdown
+        md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+        use_highlight_cache(highlights)
+        try:
+            for post in posts:
+                yield post, convert_post_file(post.filename, md, images, cache)
+        finally:
+            use_highlight_cache(None)
+
+    if cache:
+        cache.evict()
+    if highlights:
+        highlights.evict()
+
+def listing_record(post):
+    """The part of a post that listing pages depend on"""
+    return {'slug': post.slug, 'meta': post.meta, 'read_time': post.read_time}
+
+def apply_og_images(posts, image_variants):
+    """Social previews get the recompressed JPEG instead of the original"""
+    for post in posts:
+        info = image_variants.get(post.meta['image'])
+        og_image = largest_variant(info) if info else None
+        post.og_image = og_image['url'] if og_image else None
+
+# --- SEARCH INDEX ---
+SEARCH_INDEX_VERSION = 3
+SEARCH_DIR = 'search'
+SEARCH_DOCS_PER_SHARD = 64
+# Term shards bigger than this are split by a longer prefix
+SEARCH_SHARD_BYTES = 16 * 1024
+_TAG_RE = re.compile(r'<[^>]+>')
+
+def html_to_text(html):
+    return htmllib.unescape(_TAG_RE.sub(' ', html))
+
+class SearchIndex:
+    """Inverted index over each post's title, summary and full text, built
+    one post at a time so no post's HTML has to outlive its own page.
+
+    Terms are English words and Burmese syllables (see myanmar.tokenize).
+    `docs` lists [title, url, summary] per post; `terms` maps each term to a
+    flat postings list of (doc, count, positions...) groups in which doc ids
+    and positions are delta-encoded against the previous one, keeping the
+    JSON small. Positions let the client rank phrase matches first.
+    """
+
+    def __init__(self):
+        self.docs = []
+        self.terms = {}
+        self.last_doc = {}
+
+    def add(self, post, html):
+        doc_id = len(self.docs)
+        meta = post.meta
+        self.docs.append([meta['title'], post.slug, meta['summary']])
+        positions = {}
+        text = ' '.join((meta['title'], meta['summary'], html_to_text(html)))
+        for pos, term in enumerate(myanmar.tokenize(text)):
+            positions.setdefault(term, []).append(pos)
+        for term, plist in positions.items():
+            flat = self.terms.setdefault(term, [])
+            flat += [doc_id - self.last_doc.get(term, 0), len(plist)]
+            flat += [b - a for a, b in zip([0] + plist, plist)]
+            self.last_doc[term] = doc_id
+
+    def data(self):
+        terms = {term: self.terms[term] for term in sorted(self.terms)}
+        return {'version': SEARCH_INDEX_VERSION, 'docs': self.docs, 'terms': terms}
+
+def search_index(posts):
+    """The search index for posts whose `html` is already filled in"""
+    index = SearchIndex()
+    for post in posts:
+        index.add(post, post.html)
+    return index.data()
+
+def term_shard(term, depth=1):
+    """Shard key for a term: the code points of its first `depth` characters,
+    in hex, joined by '-' (`1010`, `1010-102d`, ...)"""
+    return '-'.join(f"{ord(c):x}" for c in term[:depth])
+
+def shard_terms(terms, budget=SEARCH_SHARD_BYTES):
+    """Group terms into shards keyed by term_shard(), starting from the first
+    character and splitting any shard over `budget` bytes by one more.
+
+    Returns (shards, split): a split key keeps only the terms no longer than
+    its prefix (and has no file when there are none), so a query word reads
+    the deepest key covering it, or as a prefix that key and every one
+    under it. A shard of terms too short to split may stay over budget.
+    """
+    shards = {}
+    split = set()
+    pending = [(1, terms)]
+    while pending:
+        depth, group = pending.pop()
+        buckets = {}
+        for term, flat in group.items():
+            buckets.setdefault(term_shard(term, depth), {})[term] = flat
+        for key, bucket in buckets.items():
+            longer = {t: flat for t, flat in bucket.items() if len(t) > depth}
+            if longer and len(dump_json(bucket).encode('utf-8')) > budget:
+                split.add(key)
+                pending.append((depth + 1, longer))
+                bucket = {t: flat for t, flat in bucket.items() if len(t) <= depth}
+            if bucket:
+                shards[key] = bucket
+    return shards, split
+
+def search_files(index):
+    """Split the search index into small files under search/.
+
+    `search/index.json` is the only file the client fetches up front: it
+    lists the term shards that exist, which keys were split by a longer
+    prefix, and how docs are chunked. Term shards (`t-<key>.json`) and doc
+    chunks (`docs-<n>.json`) are fetched on demand, and no shard grows past
+    SEARCH_SHARD_BYTES, so what a visitor downloads depends on their query,
+    not the archive size.
+    """
+    shards, split = shard_terms(index['terms'])
+    docs = index['docs']
+    files = {
+        f"{SEARCH_DIR}/index.json": {
+            'version': SEARCH_INDEX_VERSION,
+            'docs': len(docs),
+            'docs_per_shard': SEARCH_DOCS_PER_SHARD,
+            'shards': sorted(shards),
+            'split': sorted(split),
+        },
+    }
+    for key, terms in shards.items():
+        files[f"{SEARCH_DIR}/t-{key}.json"] = terms
+    for n, start in enumerate(range(0, len(docs), SEARCH_DOCS_PER_SHARD)):
+        files[f"{SEARCH_DIR}/docs-{n}.json"] = docs[start:start + SEARCH_DOCS_PER_SHARD]
+    return files
+
+def dump_json(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+# --- PAGE CONTEXTS ---
+def post_context(post, html=None):
+    if html is not None:
+        post = post.with_html(html)
+    return {
+        'post': post,
+        'title': post.meta.get('title'),
+        'base_url': BASE_URL,
+    }
+
+def index_page_name(page_num):
+    return 'index.html' if page_num == 1 else f'page{page_num}.html'
+
+def archive_page_name(number):
+    return f'archive-{number}.html'
+
+def listing_context(chunk, page_num, total_pages, prev_url, next_url):
+    return {
+        'posts': chunk,
+        'current_page': page_num,
+        'total_pages': total_pages,
+        'prev_url': prev_url,
+        'next_url': next_url,
+        'title': "Home",
+        'base_url': BASE_URL,
+    }
+
+def index_pages_for(posts):
+    """Yield (filename, posts on the page, template context) for every listing page"""
+    if STABLE_PAGINATION:
+        yield from stable_index_pages_for(posts)
+        return
+    total_pages = math.ceil(len(posts) / POSTS_PER_PAGE)
+    for page_num in range(1, total_pages + 1):
+        start = (page_num - 1) * POSTS_PER_PAGE
+        end = start + POSTS_PER_PAGE
+        chunk = posts[start:end]
+        
+        prev_url = ''
+        next_url = ''
+        if page_num > 1: prev_url = index_page_name(page_num - 1)
+        if page_num < total_pages: next_url = index_page_name(page_num + 1)
+
+        yield index_page_name(page_num), chunk, listing_context(chunk, page_num, total_pages, prev_url, next_url)
+
+def stable_index_pages_for(posts):
+    """Listing pages for STABLE_PAGINATION.
+
+    Archive pages are numbered from the oldest post: archive-1.html holds
+    the first POSTS_PER_PAGE posts ever published and only the newest one
+    is partly filled, so a new post changes index.html and the newest
+    archive page (plus the one before it, for its "newer" link, when a new
+    archive page starts) and leaves the rest byte-identical. index.html
+    shows the newest POSTS_PER_PAGE posts and links to the archive page
+    holding the next older post.
+    """
+    count = len(posts)
+    total_pages = math.ceil(count / POSTS_PER_PAGE)
+
+    def page_of(position):
+        # `posts` is newest first; page 1 starts at the oldest
+        return (count - 1 - position) // POSTS_PER_PAGE + 1
+
+    chunk = posts[:POSTS_PER_PAGE]
+    next_url = archive_page_name(page_of(POSTS_PER_PAGE)) if count > POSTS_PER_PAGE else ''
+    yield 'index.html', chunk, listing_context(chunk, 0, total_pages, '', next_url)
+
+    for page_num in range(1, total_pages + 1):
+        end = count - (page_num - 1) * POSTS_PER_PAGE
+        chunk = posts[max(0, end - POSTS_PER_PAGE):end]
+        prev_url = archive_page_name(page_num + 1) if page_num < total_pages else 'index.html'
+        next_url = archive_page_name(page_num - 1) if page_num > 1 else ''
+        yield archive_page_name(page_num), chunk, listing_context(chunk, page_num, total_pages, prev_url, next_url)
+
+def write_assets(manifest):
+    """Write the extracted template assets plus a _headers file giving them a
+    long-lived Cache-Control (for hosts that read Netlify-style _headers)"""
+    assets = template_assets.assets
+    for relpath, content in assets.items():
+        manifest.add(relpath, {'asset': relpath})
+        os.makedirs(os.path.dirname(os.path.join(STAGING_DIR, relpath)), exist_ok=True)
+        with open(os.path.join(STAGING_DIR, relpath), 'wb') as f:
+            f.write(content.encode('utf-8') if isinstance(content, str) else content)
+    with open(os.path.join(STAGING_DIR, HEADERS_FILE), 'w', encoding='utf-8') as f:
+        f.write(headers_file(assets))
+
+def headers_file(assets):
+    lines = []
+    for relpath in sorted(assets):
+        lines += [f"/{relpath}", f"  Cache-Control: {ASSET_CACHE_CONTROL}"]
+    return '\n'.join(lines) + '\n'
+
+# --- VENDOR CSS ---
+def _skip_css_string(css, i):
+    quote = css[i]
+    i += 1
+    while i < len(css) and css[i] != quote:
+        i += 2 if css[i] == '\\' else 1
+    return i + 1
+
+def css_blocks(css):
+    """Split a stylesheet into top-level (prelude, body) pairs.
+
+    `body` is None for statements such as @charset or @import.
+    """
+    blocks = []
+    i = start = depth = brace = 0
+    while i < len(css):
+        ch = css[i]
+        if ch in '"\'':
+            i = _skip_css_string(css, i)
+            continue
+        if ch == '{':
+            if depth == 0:
+                brace = i
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                blocks.append((css[start:brace].strip(), css[brace + 1:i]))
+                start = i + 1
+        elif ch == ';' and depth == 0:
+            blocks.append((css[start:i].strip(), None))
+            start = i + 1
+        i += 1
+    return blocks
+
+def split_selectors(prelude):
+    """Split a selector list on top-level commas, leaving :is(a, b) intact"""
+    parts, depth, start = [], 0, 0
+    for i, ch in enumerate(prelude):
+        if ch in '([':
+            depth += 1
+        elif ch in ')]':
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            parts.append(prelude[start:i].strip())
+            start = i + 1
+    parts.append(prelude[start:].strip())
+    return parts
+
+_PSEUDO_ARGS_RE = re.compile(r':(?:not|is|where|has)\((?:[^()]|\([^()]*\))*\)')
+_SELECTOR_CLASS_RE = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+_SELECTOR_ID_RE = re.compile(r'#(-?[_a-zA-Z][\w-]*)')
+_SELECTOR_ATTR_RE = re.compile(r'\[\s*([\w-]+)\s*([~|^$*]?=)\s*["\']?([^"\'\]]*)["\']?\s*\]')
+_HTML_ATTR_RE = re.compile(r'([\w-]+)="([^"]*)"')
+_JS_STRING_RE = re.compile(r'[\'"`]([\w\s-]+)[\'"`]')
+
+class UsedSelectors:
+    """Class names, ids and attribute values that appear in the site's markup"""
+
+    def __init__(self):
+        self.classes = set(VENDOR_CSS_SAFELIST)
+        self.ids = set()
+        self.attrs = {}
+
+    def add_html(self, html):
+        for name, value in _HTML_ATTR_RE.findall(html):
+            if name == 'class':
+                self.classes.update(c for c in value.split() if '{' not in c)
+            elif name == 'id':
+                self.ids.add(value)
+            self.attrs.setdefault(name, set()).add(value)
+
+    def digest(self):
+        return data_hash({
+            'classes': sorted(self.classes),
+            'ids': sorted(self.ids),
+            'attrs': {name: sorted(values) for name, values in self.attrs.items()},
+        })
+
+    def add_js(self, js):
+        # Any word in a string literal may be a class toggled by the script
+        for literal in _JS_STRING_RE.findall(js):
+            self.classes.update(literal.split())
+
+    def _attr_matches(self, name, op, wanted):
+        if name not in self.attrs:
+            return True  # never in our markup: may be set by a vendor script
+        tests = {
+            '=': lambda v: v == wanted,
+            '~=': lambda v: wanted in v.split(),
+            '|=': lambda v: v == wanted or v.startswith(wanted + '-'),
+            '^=': lambda v: v.startswith(wanted),
+            '$=': lambda v: v.endswith(wanted),
+            '*=': lambda v: wanted in v,
+        }
+        return any(tests[op](v) for v in self.attrs[name])
+
+    def matches(self, selector):
+        """False only when the selector certainly matches nothing we emit"""
+        selector = _PSEUDO_ARGS_RE.sub('', selector)
+        return (all(c in self.classes for c in _SELECTOR_CLASS_RE.findall(selector))
+                and all(i in self.ids for i in _SELECTOR_ID_RE.findall(selector))
+                and all(self._attr_matches(*a) for a in _SELECTOR_ATTR_RE.findall(selector)))
+
+def purge_css(css, used):
+    """Drop the rules of `css` whose selectors match nothing in `used`"""
+    css = _CSS_COMMENT_RE.sub('', css)
+    kept = []
+    deferred = []
+    for prelude, body in css_blocks(css):
+        if body is None:
+            kept.append(prelude + ';')
+        elif prelude.startswith(('@media', '@supports', '@layer', '@container')):
+            inner = purge_css(body, used)
+            if inner:
+                kept.append(f"{prelude}{{{inner}}}")
+        elif prelude.startswith(('@font-face', '@keyframes', '@-webkit-keyframes')):
+            # Only kept if a surviving rule refers to them; decided at the end
+            deferred.append((len(kept), prelude, body))
+            kept.append(None)
+        elif prelude.startswith('@'):
+            kept.append(f"{prelude}{{{body}}}")
+        else:
+            selectors = [sel for sel in split_selectors(prelude) if used.matches(sel)]
+            if selectors:
+                kept.append(f"{','.join(selectors)}{{{body.strip()}}}")
+    text = ''.join(k for k in kept if k)
+    for index, prelude, body in deferred:
+        if prelude.startswith('@font-face'):
+            family = re.search(r'font-family\s*:\s*["\']?([^;"\']+)', body)
+            needed = family and family.group(1).strip() in text
+        else:
+            needed = prelude.split()[-1] in text
+        if needed:
+            kept[index] = f"{prelude}{{{body.strip()}}}"
+    return ''.join(k for k in kept if k)
+
+# When each download fetch_vendor_file() could not get in this process may
+# be retried; results built without it are only cached until then
+failed_fetches = []
+
+def fetch_vendor_file(url):
+    """Download `url` once into .build/vendor; None when offline.
+
+    A failure leaves a `.failed` marker, and the URL is not tried again
+    until VENDOR_RETRY_SECONDS later (or clear_failed_fetches()).
+    """
+    path = os.path.join(VENDOR_CACHE_DIR, hashlib.sha256(url.encode('utf-8')).hexdigest()[:16] + '-' + os.path.basename(urlsplit(url).path))
+    if not os.path.exists(path):
+        marker = path + '.failed'
+        try:
+            retry_at = os.stat(marker).st_mtime + VENDOR_RETRY_SECONDS
+        except OSError:
+            retry_at = 0
+        if retry_at > time.time():
+            print(f"   ⚠️ Skipping {url}: it could not be fetched, retrying in {(retry_at - time.time()) / 60:.0f} min")
+            failed_fetches.append(retry_at)
+            return None
+        import urllib.request
+        os.makedirs(VENDOR_CACHE_DIR, exist_ok=True)
+        try:
+            # Google Fonts only serves WOFF2 to browsers it recognises
+            request = urllib.request.Request(url, headers={'User-Agent': VENDOR_USER_AGENT})
+            with urllib.request.urlopen(request, timeout=30) as response:
+                data = response.read()
+        except OSError as e:
+            print(f"   ⚠️ Could not fetch {url}: {e}")
+            with open(marker, 'w'):
+                pass
+            failed_fetches.append(time.time() + VENDOR_RETRY_SECONDS)
+            return None
+        with open(path + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(path + '.tmp', path)
+    with open(path, 'rb') as f:
+        return f.read()
+
+def clear_failed_fetches():
+    """Let every failed download be retried by this build"""
+    if os.path.isdir(VENDOR_CACHE_DIR):
+        for entry in os.scandir(VENDOR_CACHE_DIR):
+            if entry.name.endswith('.failed'):
+                os.remove(entry.path)
+
+def _cache_expiry(failures):
+    """None when every fetch since `failures` succeeded, else the time the
+    first one that failed may be retried"""
+    return min(failed_fetches[failures:], default=None)
+
+def subset_font(data, codepoints):
+    """Keep only `codepoints` in a WOFF2 font; needs fontTools (and brotli)"""
+    try:
+        from io import BytesIO
+        from fontTools import subset
+        from fontTools.ttLib import TTFont
+    except ImportError:
+        return data
+    try:
+        font = TTFont(BytesIO(data), recalcTimestamp=False)
+        options = subset.Options()
+        options.flavor = 'woff2'
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(unicodes=codepoints)
+        subsetter.subset(font)
+        out = BytesIO()
+        font.flavor = 'woff2'
+        font.save(out)
+    except Exception as e:
+        print(f"   ⚠️ Could not subset font, shipping it whole: {e}")
+        return data
+    return out.getvalue()
+
+_FONT_FACE_RE = re.compile(r'@font-face\{[^}]*\}')
+_WOFF2_SRC_RE = re.compile(r'url\(["\']?([^)"\']+\.woff2)["\']?\)\s*format\(["\']woff2["\']\)')
+_ICON_CONTENT_RE = re.compile(r'["\']\\([0-9a-fA-F]{4,6})["\']')
+
+def _self_host_fonts(css, css_url, codepoints, files):
+    """Point @font-face rules at local, subset WOFF2 copies of their fonts"""
+    def rewrite(match):
+        rule = match.group(0)
+        woff2 = _WOFF2_SRC_RE.search(rule)
+        data = subset_web_font(urljoin(css_url, woff2.group(1)), codepoints) if woff2 else None
+        if data is None:
+            return rule
+        name = os.path.splitext(os.path.basename(woff2.group(1)))[0]
+        filename = f"{name}.{hashlib.sha256(data).hexdigest()[:10]}.woff2"
+        files[f"{VENDOR_DIR}/{filename}"] = data
+        return re.sub(r'src\s*:[^;}]*', f'src:url({filename}) format("woff2")', rule, count=1)
+    return _FONT_FACE_RE.sub(rewrite, css)
+
+def template_stylesheets():
+    """CDN stylesheet URLs linked from the templates, in document order"""
+    urls = []
+    for name in sorted(os.listdir(TEMPLATE_DIR)):
+        with open(os.path.join(TEMPLATE_DIR, name), 'r', encoding='utf-8') as f:
+            for url in _STYLESHEET_LINK_RE.findall(f.read()):
+                if url not in urls:
+                    urls.append(url)
+    return urls
+
+def build_vendor_css(use_cache=True):
+    """Replace the CDN stylesheets with one purged, self-hosted bundle.
+
+    Used classes, ids and attribute values are collected from the template
+    sources, the template scripts and the inline HTML in every post's
+    Markdown, plus the few classes the converter itself emits; the page
+    markup is exactly these, so this sees what the rendered site uses
+    without converting or rendering anything first. Rules matching none of
+    them are dropped, icon fonts are subset to the glyphs still referenced
+    and written next to the bundle. Returns (link rewrites for the template
+    loader, files to publish). A stylesheet that cannot be fetched keeps its
+    CDN link.
+
+    The result is kept in ASSET_CACHE_DIR and reused until the used
+    selectors or the stylesheets change, so editing a post's text never
+    re-purges; if a stylesheet could not be fetched, only until its retry.
+    """
+    used = UsedSelectors()
+    for name in os.listdir(TEMPLATE_DIR):
+        with open(os.path.join(TEMPLATE_DIR, name), 'r', encoding='utf-8') as f:
+            source = f.read()
+        used.add_html(source)
+        for kind, body in _INLINE_BLOCK_RE.findall(source):
+            if kind == 'script':
+                used.add_js(body)
+    used.classes.update(MARKDOWN_CLASSES)
+    for name in os.listdir(CONTENT_DIR):
+        if name.endswith('.md'):
+            with open(os.path.join(CONTENT_DIR, name), 'r', encoding='utf-8') as f:
+                used.add_html(f.read())
+
+    key = data_hash({
+        'used': used.digest(),
+        'stylesheets': template_stylesheets(),
+        'asset_pipeline': ASSET_PIPELINE_VERSION,
+    })
+    cached = load_cached_assets('vendor', key) if use_cache else None
+    if cached is not None:
+        return cached
+    failures = len(failed_fetches)
+    rewrites, files = _purge_vendor_css(used)
+    save_cached_assets('vendor', key, rewrites, files, expires=_cache_expiry(failures))
+    return rewrites, files
+
+def _purge_vendor_css(used):
+    sheets = []
+    for url in template_stylesheets():
+        data = fetch_vendor_file(url)
+        if data is not None:
+            sheets.append((url, purge_css(data.decode('utf-8'), used)))
+    if not sheets:
+        return {}, {}
+
+    codepoints = {int(cp, 16) for _, css in sheets for cp in _ICON_CONTENT_RE.findall(css)}
+    files = {}
+    bundle = ''.join(_self_host_fonts(css, url, codepoints, files) for url, css in sheets)
+    relpath = f"{VENDOR_DIR}/vendor.{hashlib.sha256(bundle.encode('utf-8')).hexdigest()[:10]}.css"
+    files[relpath] = bundle
+    # The bundle takes the first sheet's place, so the cascade order is unchanged
+    rewrites = {url: '' for url, _ in sheets}
+    rewrites[sheets[0][0]] = f'<link rel="stylesheet" href="{relpath}">'
+    print(f"   Vendor CSS: {len(sheets)} stylesheet(s) purged to {len(bundle) / 1024:.1f} KB, "
+          f"{len(codepoints)} icon glyph(s)")
+    return rewrites, files
+
+# --- WEB FONTS ---
+def corpus_codepoints():
+    """How often each character occurs in the posts and templates, plus
+    printable ASCII for text the templates generate (dates, read times)"""
+    chars = Counter()
+    sources = [os.path.join(CONTENT_DIR, f) for f in os.listdir(CONTENT_DIR) if f.endswith('.md')]
+    sources += [os.path.join(TEMPLATE_DIR, f) for f in os.listdir(TEMPLATE_DIR)]
+    for path in sources:
+        with open(path, 'r', encoding='utf-8') as f:
+            chars.update(f.read())
+    counts = {c: 1 for c in range(0x20, 0x7f)}
+    for c, n in chars.items():
+        if not c.isspace():
+            counts[ord(c)] = counts.get(ord(c), 0) + n
+    return counts
+
+def parse_unicode_range(value):
+    codepoints = set()
+    for part in value.split(','):
+        part = part.strip().upper().removeprefix('U+')
+        if not part:
+            continue
+        if '-' in part:
+            lo, hi = part.split('-')
+        else:
+            lo, hi = part.replace('?', '0'), part.replace('?', 'F')
+        codepoints.update(range(int(lo, 16), int(hi, 16) + 1))
+    return codepoints
+
+def _font_descriptor(body, name):
+    match = re.search(rf'{name}\s*:\s*([^;]+)', body)
+    return match.group(1).strip().strip('"\'') if match else ''
+
+def subset_web_font(url, codepoints):
+    """Subset the WOFF2 at `url` to `codepoints`, cached by both, so a font
+    is only re-subset when the corpus gains characters in its range"""
+    key = data_hash({'url': url, 'codepoints': sorted(codepoints)})
+    path = os.path.join(FONT_CACHE_DIR, key + '.woff2')
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return f.read()
+    data = fetch_vendor_file(url)
+    if data is None:
+        return None
+    data = subset_font(data, codepoints)
+    os.makedirs(FONT_CACHE_DIR, exist_ok=True)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(path + '.tmp', path)
+    return data
+
+def build_web_fonts():
+    """Self-host the Google Fonts linked from the templates.
+
+    Each @font-face that Google splits out by unicode-range is kept only if
+    the corpus uses a character in its range, subset to those characters
+    and written to fonts/ under a content hash. The faces in FONT_PRELOAD get
+    preload hints, and every face uses FONT_DISPLAY. Returns (link rewrites
+    for the template loader, files to publish); with no network the Google
+    links are left alone.
+    """
+    hrefs = []
+    for name in sorted(os.listdir(TEMPLATE_DIR)):
+        with open(os.path.join(TEMPLATE_DIR, name), 'r', encoding='utf-8') as f:
+            hrefs += [h for h in _GOOGLE_FONTS_CSS_RE.findall(f.read()) if h not in hrefs]
+    if not hrefs:
+        return {}, {}
+    counts = corpus_codepoints()
+    used = set(counts)
+    rewrites = {}
+    files = {}
+    for href in hrefs:
+        url = htmllib.unescape(href)
+        data = fetch_vendor_file(url)
+        if data is None:
+            continue
+        faces = []
+        preloads = {}
+        face_files = {}
+        for prelude, body in css_blocks(_CSS_COMMENT_RE.sub('', data.decode('utf-8'))):
+            woff2 = _WOFF2_SRC_RE.search(body or '')
+            if prelude != '@font-face' or not woff2:
+                continue
+            unicode_range = _font_descriptor(body, 'unicode-range')
+            wanted = used & parse_unicode_range(unicode_range) if unicode_range else used
+            if not wanted:
+                continue
+            font = subset_web_font(urljoin(url, woff2.group(1)), wanted)
+            if font is None:
+                break
+            family = _font_descriptor(body, 'font-family')
+            weight = _font_descriptor(body, 'font-weight')
+            relpath = f"{FONTS_DIR}/{family.replace(' ', '')}-{weight}.{hashlib.sha256(font).hexdigest()[:10]}.woff2"
+            face_files[relpath] = font
+            face = re.sub(r'src\s*:[^;}]*', f'src:url({os.path.basename(relpath)}) format("woff2")', body.strip(), count=1)
+            face = re.sub(r'font-display\s*:[^;}]*;?', '', face).rstrip(';')
+            faces.append(f"@font-face{{{face};font-display:{FONT_DISPLAY}}}")
+            # Preload only the chunk of each face that covers the most text
+            coverage = sum(counts[c] for c in wanted)
+            if (family, weight) in FONT_PRELOAD and coverage > preloads.get((family, weight), (0, ''))[0]:
+                preloads[family, weight] = (coverage, relpath)
+        else:
+            css = minify_css(''.join(faces))
+            css_path = f"{FONTS_DIR}/fonts.{hashlib.sha256(css.encode('utf-8')).hexdigest()[:10]}.css"
+            files.update(face_files)
+            files[css_path] = css
+            rewrites[href] = ''.join(f'<link rel="preload" href="{relpath}" as="font" type="font/woff2" crossorigin>'
+                                     for _, relpath in preloads.values()) + f'<link rel="stylesheet" href="{css_path}">'
+            print(f"   Web fonts: {len(faces)} face(s) subset to the {len(used)} character(s) in use")
+    if rewrites:
+        # Nothing is fetched from Google any more
+        rewrites.update({origin: '' for origin in _FONT_ORIGINS})
+    return rewrites, files
+
+def prepare_assets(posts, use_cache=True):
+    """Self-host vendor CSS and web fonts and point the templates at them;
+    returns a hash of the rewrites, which every page's markup depends on.
+
+    Both scan every template and post, so the result is kept in
+    ASSET_CACHE_DIR and reused while those are unchanged (if a stylesheet
+    or font could not be fetched, only until it may be retried);
+    `use_cache=False` (--clean) redoes it and retries failed downloads now.
+    """
+    if not use_cache:
+        clear_failed_fetches()
+    key = data_hash({
+        'templates': template_source_hashes(),
+        'posts': {p.filename: p.source_hash for p in posts},
+        'safelist': sorted(VENDOR_CSS_SAFELIST),
+        'markdown_classes': sorted(MARKDOWN_CLASSES),
+        'font_display': FONT_DISPLAY,
+        'font_preload': FONT_PRELOAD,
+        'asset_pipeline': ASSET_PIPELINE_VERSION,
+    })
+    cached = load_cached_assets('site', key) if use_cache else None
+    if cached is None:
+        failures = len(failed_fetches)
+        vendor_links, vendor_files = build_vendor_css(use_cache)
+        font_links, font_files = build_web_fonts()
+        links = {**vendor_links, **font_links}
+        files = {**vendor_files, **font_files}
+        save_cached_assets('site', key, links, files, expires=_cache_expiry(failures))
+    else:
+        links, files = cached
+    reset_templates(links)
+    template_assets.assets.update(files)
+    return data_hash(links)
+
+def load_cached_assets(name, key):
+    """(links, files) saved under `name` by save_cached_assets() if `key`
+    matches and the entry has not expired"""
+    cache_dir = os.path.join(ASSET_CACHE_DIR, name)
+    try:
+        with open(os.path.join(cache_dir, 'index.json'), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index['key'] != key or (index['expires'] is not None and index['expires'] <= time.time()):
+            return None
+        files = {}
+        for relpath in index['files']:
+            with open(os.path.join(cache_dir, 'files', relpath), 'rb') as f:
+                files[relpath] = f.read()
+    except (OSError, ValueError, KeyError):
+        return None
+    if index['expires'] is not None:
+        print(f"   ⚠️ Reusing {name} assets built without a failed download, "
+              f"retrying it in {(index['expires'] - time.time()) / 60:.0f} min")
+    return index['links'], files
+
+def save_cached_assets(name, key, links, files, expires=None):
+    cache_dir = os.path.join(ASSET_CACHE_DIR, name)
+    tmp_dir = cache_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    for relpath, content in files.items():
+        path = os.path.join(tmp_dir, 'files', relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content.encode('utf-8') if isinstance(content, str) else content)
+    os.makedirs(tmp_dir, exist_ok=True)
+    with open(os.path.join(tmp_dir, 'index.json'), 'w', encoding='utf-8') as f:
+        json.dump({'key': key, 'expires': expires, 'links': links, 'files': sorted(files)}, f, ensure_ascii=False)
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(tmp_dir, cache_dir)
+
+# --- COMPRESSION ---
+def _compressors():
+    compressors = {'.gz': lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        print("   ⚠️ brotli is not installed; writing .gz siblings only.")
+        return compressors
+    compressors['.br'] = lambda data: brotli.compress(data, quality=11)
+    return compressors
+
+def _compress_file(src, dst_base, compressors):
+    with open(src, 'rb') as f:
+        data = f.read()
+    for suffix, compress in compressors.items():
+        with open(dst_base + suffix, 'wb') as f:
+            f.write(compress(data))
+
+def compress_outputs(manifest, jobs=1):
+    """Write .br and .gz siblings of every text output, for hosts that serve
+    precompressed files.
+
+    Only files whose bytes changed are compressed (from the staging folder);
+    fresh and re-rendered-but-identical outputs keep the siblings they
+    already have, so only changed pages pay for max-quality Brotli.
+    """
+    compressors = _compressors()
+    todo = []
+    staged = set()
+    for relpath, path in list(_walk_files(STAGING_DIR)):
+        if not relpath.endswith(COMPRESS_EXTENSIONS):
+            continue
+        staged.add(relpath)
+        live = os.path.join(OUTPUT_DIR, relpath)
+        # Re-rendered to the same bytes: the live siblings still match
+        if (all(os.path.exists(live + suffix) for suffix in compressors)
+                and os.path.isfile(live) and filecmp.cmp(path, live, shallow=False)):
+            for suffix in compressors:
+                shutil.copy2(live + suffix, path + suffix)
+            continue
+        todo.append((path, path))
+    for relpath, record in list(manifest.current.items()):
+        if not relpath.endswith(COMPRESS_EXTENSIONS):
+            continue
+        for suffix in compressors:
+            manifest.add(relpath + suffix, record)
+        live = os.path.join(OUTPUT_DIR, relpath)
+        if relpath not in staged and not all(os.path.exists(live + suffix) for suffix in compressors):
+            dst_base = os.path.join(STAGING_DIR, relpath)
+            os.makedirs(os.path.dirname(dst_base), exist_ok=True)
+            todo.append((live, dst_base))
+    if not todo:
+        return
+    started = time.perf_counter()
+    if jobs > 1 and len(todo) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            list(pool.map(lambda job: _compress_file(*job, compressors), todo))
+    else:
+        for job in todo:
+            _compress_file(*job, compressors)
+    elapsed = time.perf_counter() - started
+    print(f"   Compressed {len(todo)} file(s) ({', '.join(compressors)}) in {elapsed:.2f}s")
+
+# --- RENDER STAGE ---
+PAGE_WRITE_BUFFER = 64 * 1024
+
+def write_page(relpath, template, context):
+    # Stream the template's output into the file instead of building the
+    # whole page as one string first; only the post body is ever held whole
+    with open(os.path.join(STAGING_DIR, relpath), 'wb', buffering=PAGE_WRITE_BUFFER) as f:
+        template.stream(**context).dump(f, encoding='utf-8')
+
+def render_pages(phase, pages, jobs=1):
+    """Render and write (relpath, template, context) jobs, reporting throughput.
+
+    A list of pages is fanned out over a thread pool; every page is written
+    to its own file, so the output is the same as rendering them one by one.
+    Any other iterable is consumed lazily, one page at a time, so pages
+    produced on the fly are dropped as soon as they are written.
+    """
+    started = time.perf_counter()
+    if isinstance(pages, list) and jobs > 1 and len(pages) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            # list() re-raises the first render error, if any
+            list(pool.map(lambda page: write_page(*page), pages))
+        count = len(pages)
+    else:
+        count = 0
+        for page in pages:
+            write_page(*page)
+            count += 1
+    if not count:
+        print(f"   {phase}: nothing to render")
+        return 0
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed > 0 else float('inf')
+    print(f"   {phase}: {count} page(s) in {elapsed:.3f}s ({rate:.0f} pages/sec)")
+    return count
+
+# tracemalloc itself is only imported under --trace-memory
+_tracemalloc = None
+
+def start_memory_trace():
+    global _tracemalloc
+    import tracemalloc
+    _tracemalloc = tracemalloc
+    tracemalloc.start()
+
+def trace_memory(phase):
+    """Report, under --trace-memory, the peak traced since the last report"""
+    tracemalloc = _tracemalloc
+    if tracemalloc is not None:
+        current, peak = tracemalloc.get_traced_memory()
+        print(f"   🧠 {phase}: peak {peak / 1e6:.1f} MB, {current / 1e6:.1f} MB held after")
+        tracemalloc.reset_peak()
+
+def build(clean=False, jobs=1, verify_images=False, use_cache=True, precompile=False):
     print("🚀 Starting Build Process...")
-    clean_and_create_dir(OUTPUT_DIR)
+    # Everything is generated into a staging folder first; the live site is
+    # only touched by publish_staging() once the whole build has succeeded.
+    clean_and_create_dir(STAGING_DIR)
+    manifest = BuildManifest(force=clean)
+    config_hash = data_hash(build_config())
     
     # ၁။ CNAME ဖိုင် အရင်ဆောက်ပါ (အရေးကြီးသည်)
     create_cname_file()
 
-    src_img = os.path.join(CONTENT_DIR, 'images')
-    if os.path.exists(src_img):
-        print("   Copying images...")
-        shutil.copytree(src_img, os.path.join(OUTPUT_DIR, 'images'), dirs_exist_ok=True)
-
-    generate_css_syntax_highlighting()
-    posts = parse_markdown_posts()
+    generate_css_syntax_highlighting(manifest)
+    image_variants = optimize_images(jobs)
+    posts = scan_posts(image_variants)
     
     if not posts:
         print("❌ No posts found. Exiting.")
         return
 
+    apply_og_images(posts, image_variants)
+    trace_memory("Images and front matter")
+    assets_hash = prepare_assets(posts, use_cache=use_cache and not clean)
+    if precompile:
+        compile_templates()
+
     # Search Index
-    search_data = []
-    for post in posts:
-        search_data.append({
-            "title": post['meta']['title'],
-            "url": post['slug'],
-            "summary": post['meta']['summary']
-        })
-    with open(os.path.join(OUTPUT_DIR, 'search.json'), 'w', encoding='utf-8') as f:
-        json.dump(search_data, f)
+    # Every shard carries this record, so the sources go in as one digest
+    search_record = {
+        'sources': data_hash({p.filename: p.source_hash for p in posts}),
+        'version': [SEARCH_INDEX_VERSION, myanmar.VERSION, SEARCH_DOCS_PER_SHARD, SEARCH_SHARD_BYTES],
+        'config': config_hash,
+    }
+    # The shard set is only known once the index is built, so a fresh record
+    # just carries the previous build's shard files forward; a rebuilt index
+    # records its own, and shards it no longer writes are removed as stale
+    previous_shards = [p for p in manifest.previous if p.startswith(SEARCH_DIR + os.sep)]
+    fresh = [manifest.was_built(p, search_record) for p in previous_shards]
+    search_stale = not (fresh and all(fresh))
+    if not search_stale:
+        for p in previous_shards:
+            manifest.add(p, search_record)
 
     print(f"   Generating HTML for {len(posts)} posts...")
     
-    try:
-        post_template = env.get_template('post.html')
-        index_template = env.get_template('index.html')
-    except Exception as e:
-        print(f"❌ Template Error: {e}")
-        return
+    post_templates = template_hashes('post.html')
+    index_templates = template_hashes('index.html')
+    # Their assets are published even when no page needs rendering, in which
+    # case Jinja is never loaded
+    extract_template_assets(set(post_templates) | set(index_templates))
 
+    stale_slugs = set()
     for post in posts:
-        output_path = os.path.join(OUTPUT_DIR, post['slug'])
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(post_template.render(
-                post=post, 
-                title=post['meta'].get('title'),
-                base_url=BASE_URL
-            ))
-    
-    total_posts = len(posts)
-    total_pages = math.ceil(total_posts / POSTS_PER_PAGE)
+        record = {
+            'sources': {post.filename: post.source_hash},
+            'images': post.images,
+            'og_image': post.full_image_url,
+            # Depends on myanmar.word_count() as well as the source
+            'read_time': post.read_time,
+            'templates': post_templates,
+            'assets': assets_hash,
+            'config': config_hash,
+        }
+        if not manifest.is_fresh(post.slug, record):
+            stale_slugs.add(post.slug)
 
-    for page_num in range(1, total_pages + 1):
-        start = (page_num - 1) * POSTS_PER_PAGE
-        end = start + POSTS_PER_PAGE
-        chunk = posts[start:end]
-        
-        filename = 'index.html' if page_num == 1 else f'page{page_num}.html'
-        
-        prev_url = ''
-        next_url = ''
-        if page_num > 1: prev_url = 'index.html' if page_num == 2 else f'page{page_num-1}.html'
-        if page_num < total_pages: next_url = f'page{page_num+1}.html'
-
-        with open(os.path.join(OUTPUT_DIR, filename), 'w', encoding='utf-8') as f:
-            f.write(index_template.render(
-                posts=chunk,
-                current_page=page_num,
-                total_pages=total_pages,
-                prev_url=prev_url,
-                next_url=next_url,
-                title="Home",
-                base_url=BASE_URL
-            ))
+    index_pages = []
+    listing_count = 0
+    for filename, chunk, context in index_pages_for(posts):
+        listing_count += 1
+        record = {
+            'sources': {p.filename: data_hash(listing_record(p)) for p in chunk},
+            'templates': index_templates,
+            'assets': assets_hash,
+            'config': config_hash,
+            'params': [context['current_page'], context['prev_url'], context['next_url']],
+        }
+        if manifest.is_fresh(filename, record):
+            continue
+        index_pages.append((filename, context))
+    trace_memory("Assets and metadata")
+
+    post_template = index_template = None
+    if stale_slugs or index_pages:
+        try:
+            if use_compiled_templates():
+                print("   Using precompiled templates")
+            env = template_env()
+            post_template = env.get_template('post.html')
+            index_template = env.get_template('index.html')
+        except Exception as e:
+            print(f"❌ Template Error: {e}")
+            return
+
+    # Second pass: each post is converted, indexed for search and written
+    # out before the next one is read. Only stale posts need converting,
+    # unless the search index (which covers every post's text) is stale too.
+    search = SearchIndex() if search_stale else None
+    highlights = HighlightCache() if use_cache else None
+
+    def post_pages():
+        todo = posts if search is not None else [p for p in posts if p.slug in stale_slugs]
+        cache = RenderCache() if use_cache else None
+        for post, html in stream_posts(todo, jobs, image_variants, cache, highlights):
+            if search is not None:
+                search.add(post, html)
+            if post.slug in stale_slugs:
+                yield post.slug, post_template, post_context(post, html)
+
+    rendered = render_pages("Posts", post_pages())
+    trace_memory("Post pass")
 
+    if search is not None:
+        os.makedirs(os.path.join(STAGING_DIR, SEARCH_DIR), exist_ok=True)
+        for url_path, data in search_files(search.data()).items():
+            relpath = os.path.normpath(url_path)
+            manifest.add(relpath, search_record)
+            with open(os.path.join(STAGING_DIR, relpath), 'w', encoding='utf-8') as f:
+                f.write(dump_json(data))
+        search = None
+
+    rendered += render_pages("Index pages", [(filename, index_template, context) for filename, context in index_pages], jobs)
+    trace_memory("Search and index pages")
+    write_assets(manifest)
+    compress_outputs(manifest, jobs)
+
+    # Images skip staging: each one is swapped in atomically on its own, and
+    # they land before the pages that reference them are published
+    sync_images(manifest, verify_hash=verify_images)
+    publish_image_variants(manifest, image_variants)
+    publish_staging(manifest, clean=clean)
+    manifest.save()
+    print(f"   Rendered {rendered} page(s), {len(posts) + listing_count - rendered} unchanged.")
+    if highlights and highlights.hits + highlights.misses:
+        print(f"   Highlighted {highlights.hits + highlights.misses} code block(s): "
+              f"{highlights.hits} cached, {highlights.misses} new.")
+    trace_memory("Publishing")
     print(f"✅ Build Complete! Generated website in '{OUTPUT_DIR}/' folder.")
 
+# --- WATCH MODE ---
+def _is_watched(path):
+    """Skip editor swap/backup files and our own temporaries"""
+    name = os.path.basename(path)
+    return not (name.startswith('.') or name.endswith(('~', '.swp', '.swx', '.tmp')))
+
+def _snapshot(roots):
+    state = {}
+    for root in roots:
+        for _, path in _walk_files(root):
+            if _is_watched(path):
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                state[path] = (st.st_mtime_ns, st.st_size)
+    return state
+
+def _poll_changes(roots, events, stop):
+    previous = _snapshot(roots)
+    while not stop.wait(WATCH_POLL_INTERVAL):
+        current = _snapshot(roots)
+        for path in previous.keys() | current.keys():
+            if previous.get(path) != current.get(path):
+                events.put(path)
+        previous = current
+
+def _start_watcher(roots, events):
+    """Feed changed paths into `events`, via inotify (watchdog) when available"""
+    try:
+        from watchdog.observers import Observer
+        from watchdog.events import FileSystemEventHandler
+    except ImportError:
+        stop = threading.Event()
+        threading.Thread(target=_poll_changes, args=(roots, events, stop), daemon=True).start()
+        print(f"   Watching {', '.join(roots)} (polling every {WATCH_POLL_INTERVAL}s; install watchdog for inotify)")
+        return stop.set
+
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            if event.is_directory:
+                return
+            for path in (event.src_path, getattr(event, 'dest_path', '')):
+                if path and _is_watched(path):
+                    events.put(os.path.relpath(path))
+
+    observer = Observer()
+    for root in roots:
+        observer.schedule(Handler(), root, recursive=True)
+    observer.start()
+    print(f"   Watching {', '.join(roots)} (inotify)")
+    def stop():
+        observer.stop()
+        observer.join()
+    return stop
+
+def _next_batch(events, debounce):
+    """Block for a change, then gather the rest of its burst"""
+    changed = {events.get()}
+    while True:
+        try:
+            changed.add(events.get(timeout=debounce))
+        except queue.Empty:
+            return changed
+
+def describe_changes(paths):
+    """Summarise a batch of changed paths by what they will cause to rebuild"""
+    images_dir = os.path.join(CONTENT_DIR, 'images') + os.sep
+    posts = sorted(os.path.basename(p) for p in paths if p.endswith('.md'))
+    images = sorted(p for p in paths if p.startswith(images_dir))
+    templates = sorted(os.path.basename(p) for p in paths if p.startswith(TEMPLATE_DIR + os.sep))
+    parts = []
+    if posts: parts.append(f"post(s) {', '.join(posts)}")
+    if images: parts.append(f"{len(images)} image(s)")
+    if templates: parts.append(f"template(s) {', '.join(templates)}")
+    return '; '.join(parts) or f"{len(paths)} file(s)"
+
+def watch(clean=False, jobs=1, verify_images=False, use_cache=True, precompile=False):
+    """Rebuild whenever content/ or templates/ change, until interrupted.
+
+    Bursts of events are collected until nothing has changed for
+    WATCH_DEBOUNCE seconds, then one incremental build runs. The manifest
+    keeps that build minimal: a post edit re-renders that post (and the
+    listing pages only if its title, summary or date moved), an image drop
+    only syncs images and the posts that show them, and a template edit
+    re-renders just the pages that inherit from it.
+    """
+    build(clean=clean, jobs=jobs, verify_images=verify_images, use_cache=use_cache, precompile=precompile)
+    events = queue.Queue()
+    stop = _start_watcher([CONTENT_DIR, TEMPLATE_DIR], events)
+    print("👀 Waiting for changes (Ctrl+C to stop)...")
+    try:
+        while True:
+            changed = _next_batch(events, WATCH_DEBOUNCE)
+            print(f"\n🔁 Changed: {describe_changes(changed)}")
+            try:
+                build(jobs=jobs, verify_images=verify_images, use_cache=use_cache, precompile=precompile)
+            except Exception as e:
+                print(f"❌ Build failed: {e}")
+    except KeyboardInterrupt:
+        print("\n   Stopped watching.")
+    finally:
+        stop()
+
+# --- PREVIEW SERVER ---
+class PreviewSite:
+    """The whole site held in memory and rendered per request.
+
+    Posts are scanned for their front matter up front and converted the
+    first time they are requested (all of them when search is first
+    opened); a change re-scans only the files that changed, and templates are picked up by Jinja's auto-reload, so
+    edit-to-refresh does not depend on the size of the archive. Nothing is
+    written to docs/.
+    """
+
+    def __init__(self, jobs=1, use_cache=True):
+        import markdown
+        self.lock = threading.Lock()
+        self.cache = RenderCache() if use_cache else None
+        self.md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+        use_highlight_cache(HighlightCache() if use_cache else None)
+        self.generation = 0
+        self.changed = threading.Condition()
+        self.images = optimize_images(jobs)
+        self.posts_by_file = {p.filename: p for p in scan_posts(self.images)}
+        self._index()
+        prepare_assets(self.posts, use_cache)
+
+    def _index(self):
+        posts = sorted(self.posts_by_file.values(), key=lambda p: p.filename)
+        posts.sort(key=lambda x: x.date, reverse=True)
+        apply_og_images(posts, self.images)
+        self.posts = posts
+        self.by_slug = {p.slug: p for p in posts}
+        self.search = None
+        self.variant_files = {v['url']: v['cache'] for info in self.images.values() for v in info['variants']}
+
+    def _convert(self, posts):
+        for post in posts:
+            if post.html is None:
+                post.html = convert_post_file(post.filename, self.md, self.images, self.cache)
+
+    def reload(self, paths):
+        """Bring the in-memory site up to date with changed source paths"""
+        images_dir = os.path.join(CONTENT_DIR, 'images') + os.sep
+        with self.lock:
+            if any(p.startswith(images_dir) for p in paths):
+                self.images = optimize_images()
+                dirty = set(self.posts_by_file)
+            else:
+                dirty = {os.path.basename(p) for p in paths
+                         if p.endswith('.md') and os.path.dirname(p) == CONTENT_DIR}
+            for filename in dirty:
+                if os.path.exists(os.path.join(CONTENT_DIR, filename)):
+                    self.posts_by_file[filename] = scan_post_file(filename, self.images)
+                else:
+                    self.posts_by_file.pop(filename, None)
+            self._index()
+        with self.changed:
+            self.generation += 1
+            self.changed.notify_all()
+
+    def render(self, path):
+        """(content type, body bytes) for a site path, or None if it is not generated"""
+        with self.lock:
+            if path.startswith(SEARCH_DIR + '/'):
+                if self.search is None:
+                    self._convert(self.posts)
+                    self.search = search_files(search_index(self.posts))
+                if path not in self.search:
+                    return None
+                return 'application/json', dump_json(self.search[path]).encode('utf-8')
+            if path == 'css/syntax.css':
+                return 'text/css', syntax_css().encode('utf-8')
+            if path == 'CNAME':
+                return 'text/plain', DOMAIN_NAME.encode('utf-8')
+            if path in template_assets.assets:
+                content = template_assets.assets[path]
+                import mimetypes
+                return mimetypes.guess_type(path)[0], content.encode('utf-8') if isinstance(content, str) else content
+            if path in self.by_slug:
+                post = self.by_slug[path]
+                self._convert([post])
+                html = template_env().get_template('post.html').render(**post_context(post))
+            else:
+                pages = {name: context for name, _, context in index_pages_for(self.posts)}
+                if path not in pages:
+                    return None
+                html = template_env().get_template('index.html').render(**pages[path])
+        return 'text/html; charset=utf-8', html.replace('</body>', LIVE_RELOAD_SCRIPT + '</body>', 1).encode('utf-8')
+
+    def static_file(self, path):
+        """Location on disk of an image, variant or other published asset"""
+        if path in self.variant_files:
+            return self.variant_files[path]
+        for root, prefix in ((os.path.join(CONTENT_DIR, 'images'), 'images/'), (OUTPUT_DIR, '')):
+            if path.startswith(prefix):
+                candidate = os.path.normpath(os.path.join(root, path[len(prefix):]))
+                if candidate.startswith(os.path.normpath(root) + os.sep) and os.path.isfile(candidate):
+                    return candidate
+        return None
+
+def _preview_handler(site):
+    from http.server import BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, content_type, body):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _live_reload(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            with site.changed:
+                seen = site.generation
+            try:
+                while True:
+                    with site.changed:
+                        site.changed.wait_for(lambda: site.generation != seen, timeout=15)
+                        current = site.generation
+                    # Comment lines keep idle connections from timing out
+                    self.wfile.write(b'data: reload\n\n' if current != seen else b': ping\n\n')
+                    self.wfile.flush()
+                    seen = current
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def do_GET(self):
+            path = unquote(urlsplit(self.path).path)
+            if path == LIVE_RELOAD_PATH:
+                return self._live_reload()
+            path = path.lstrip('/') or 'index.html'
+            started = time.perf_counter()
+            try:
+                page = site.render(path)
+            except Exception as e:
+                return self._send(500, 'text/plain; charset=utf-8', f"Render error: {e}".encode('utf-8'))
+            if page:
+                print(f"   {path} rendered in {(time.perf_counter() - started) * 1000:.1f}ms")
+                return self._send(200, *page)
+            file_path = site.static_file(path)
+            if not file_path:
+                return self._send(404, 'text/plain; charset=utf-8', b'Not found')
+            with open(file_path, 'rb') as f:
+                body = f.read()
+            import mimetypes
+            self._send(200, mimetypes.guess_type(file_path)[0] or 'application/octet-stream', body)
+
+    return Handler
+
+def serve(port=SERVE_PORT, jobs=1, use_cache=True):
+    """Preview the site from memory on localhost, reloading browsers on every change"""
+    print("🚀 Starting preview server...")
+    site = PreviewSite(jobs=jobs, use_cache=use_cache)
+    events = queue.Queue()
+    stop_watching = _start_watcher([CONTENT_DIR, TEMPLATE_DIR], events)
+
+    def apply_changes():
+        while True:
+            changed = _next_batch(events, SERVE_DEBOUNCE)
+            started = time.perf_counter()
+            try:
+                site.reload(changed)
+            except Exception as e:
+                print(f"❌ Reload failed: {e}")
+                continue
+            print(f"🔁 {describe_changes(changed)} reloaded in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    threading.Thread(target=apply_changes, daemon=True).start()
+    from http.server import ThreadingHTTPServer
+    server = ThreadingHTTPServer(('127.0.0.1', port), _preview_handler(site))
+    server.daemon_threads = True
+    print(f"✅ Serving {len(site.posts)} posts at http://127.0.0.1:{port}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n   Stopped serving.")
+    finally:
+        server.server_close()
+        stop_watching()
+
+# --- STARTUP PROFILE ---
+def _wall_ms(args, runs):
+    import statistics
+    import subprocess
+    import sys
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, *args], check=True, stdout=subprocess.DEVNULL)
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+def _import_code(script):
+    return f"import sys; sys.path.insert(0, {os.path.dirname(script)!r}); import {os.path.splitext(os.path.basename(script))[0]}"
+
+def _import_times(script):
+    """[(ms, module)] for the direct imports of `script`, slowest first, from
+    python -X importtime (whose own overhead inflates them somewhat)"""
+    import subprocess
+    import sys
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', _import_code(script)],
+                            check=True, capture_output=True, text=True)
+    # Each line is "import time: self | cumulative | name", indented two
+    # spaces per level, with a module printed after everything it imports
+    entries = []
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            name = parts[2][1:]
+            entries.append(((len(name) - len(name.lstrip())) // 2, int(parts[1]) / 1000, name.strip()))
+    children = []
+    for depth, ms, name in reversed(entries[:-1]):
+        if depth == 0:
+            break
+        if depth == 1:
+            children.append((ms, name))
+    return sorted(children, reverse=True)
+
+def profile_startup(jobs=1, runs=5):
+    """Time build.py's startup in fresh interpreters: the bare interpreter,
+    importing the module (with its slowest imports from python -X
+    importtime), `--help`, and a no-op build after one warm-up build, each
+    the median of `runs`"""
+    import sys
+    script = os.path.abspath(__file__)
+    print(f"⏱️ Profiling startup (median of {runs} runs)...")
+    if sys.dont_write_bytecode:
+        print("   ⚠️ PYTHONDONTWRITEBYTECODE is set: every run recompiles the modules it imports")
+    print(f"   Python itself: {_wall_ms(['-c', 'pass'], runs):.0f} ms")
+    slowest = ', '.join(f'{name} {ms:.1f}' for ms, name in _import_times(script)[:6])
+    print(f"   Import: {_wall_ms(['-c', _import_code(script)], runs):.0f} ms (slowest: {slowest})")
+    print(f"   --help: {_wall_ms([script, '--help'], runs):.0f} ms")
+    _wall_ms([script, '-j', str(jobs)], 1)
+    print(f"   No-op build: {_wall_ms([script, '-j', str(jobs)], runs):.0f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Science Daily Myanmar static site.")
+    parser.add_argument('--clean', action='store_true',
+                        help=f"rebuild everything, ignoring the build manifest, and drop any file in '{OUTPUT_DIR}/' the build did not produce")
+    parser.add_argument('-j', '--jobs', type=int, default=default_jobs(),
+                        help="parallel workers for parsing and rendering (default: CPU count, 1 = serial)")
+    parser.add_argument('--verify-images', action='store_true',
+                        help="when an image's size matches but its mtime does not, compare contents by hash before copying")
+    parser.add_argument('--no-cache', dest='use_cache', action='store_false',
+                        help="convert every post and re-derive vendor CSS and fonts from scratch, bypassing the render and asset caches in .build")
+    parser.add_argument('--watch', action='store_true',
+                        help="keep running and rebuild incrementally whenever content/ or templates/ change")
+    parser.add_argument('--serve', action='store_true',
+                        help="preview the site from memory on localhost with live reload, without writing to docs/")
+    parser.add_argument('--port', type=int, default=SERVE_PORT,
+                        help=f"port for --serve (default: {SERVE_PORT})")
+    parser.add_argument('--precompile-templates', dest='precompile', action='store_true',
+                        help=f"compile the templates into Python modules in {COMPILED_TEMPLATE_DIR}; later builds load those while the templates are unchanged")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="report the peak Python memory of each build phase (tracemalloc; slows the build down)")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="time module imports, --help and a no-op build in fresh interpreters, instead of building")
+    args = parser.parse_args()
+    if args.profile_startup:
+        profile_startup(jobs=args.jobs)
+        return
+    if args.trace_memory:
+        start_memory_trace()
+    if args.serve:
+        serve(port=args.port, jobs=args.jobs, use_cache=args.use_cache)
+        return
+    # Builds load each template once and every build starts from
+    # reset_templates(), so checking template mtimes on each lookup is wasted
+    env_options['auto_reload'] = False
+    if args.watch:
+        watch(clean=args.clean, jobs=args.jobs, verify_images=args.verify_images, use_cache=args.use_cache, precompile=args.precompile)
+    else:
+        build(clean=args.clean, jobs=args.jobs, verify_images=args.verify_images, use_cache=args.use_cache, precompile=args.precompile)
+
 if __name__ == "__main__":
-    build()
\ No newline at end of file
+    main()
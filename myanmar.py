@@ -0,0 +1,88 @@
+"""Myanmar (Burmese) syllable segmentation.
+
+Burmese is written without spaces between words, so whitespace splitting
+sees a whole clause as one "word". Syllables are the unit we can find
+reliably with a table of character classes: a new syllable starts at every
+consonant that is neither stacked under the previous one (preceded by the
+virama ္) nor killed by an asat/virama of its own, and at every independent
+vowel, standalone symbol or run of digits.
+
+The same rules are mirrored by the search script in templates/base.html;
+bump VERSION whenever the output of tokenize() changes.
+
+Run `python myanmar.py` to benchmark the segmenter on the whole corpus, and
+`python -m doctest myanmar.py` to check it.
+"""
+import os
+import re
+import sys
+import time
+
+VERSION = 2
+
+_CONSONANTS = r'\u1000-\u1021'                      # က..အ
+_VIRAMA = r'\u1039'                                 # ္ (stacked consonant follows)
+_ASAT = r'\u103a'                                   # ်
+_DOT_BELOW = r'\u1037'                              # ့ (sorts before the asat)
+_STANDALONE = r'\u1023-\u102a\u103f\u104c-\u104f'   # ဣ..ဪ ဿ ၌..၏
+_DIGITS = r'\u1040-\u1049'                          # ၀..၉
+
+# Latin words, or runs of Myanmar letters and marks (section marks ၊ ။ excluded)
+_TOKEN_RE = re.compile(r'[0-9a-z\u00c0-\u024f]+|[\u1000-\u1049\u104c-\u109f\ua9e0-\ua9ff\uaa60-\uaa7f]+')
+_BREAK_RE = re.compile(
+    rf'(?<![{_VIRAMA}])(?=[{_CONSONANTS}](?![{_DOT_BELOW}]?[{_ASAT}{_VIRAMA}]))'
+    rf'|(?=[{_STANDALONE}])'
+    rf'|(?<![{_DIGITS}])(?=[{_DIGITS}])')
+_MYANMAR_RE = re.compile(r'[\u1000-\u109f\ua9e0-\ua9ff\uaa60-\uaa7f]')
+
+# Average syllables in a Burmese word, for comparing with English word counts
+SYLLABLES_PER_WORD = 2
+
+def syllables(run):
+    """Split a run of Myanmar script into syllables
+
+    >>> syllables('ကြောင့်')
+    ['ကြောင့်']
+    >>> syllables('ကိုယ့်')
+    ['ကိုယ့်']
+    >>> syllables('မြန်မာစာ')
+    ['မြန်', 'မာ', 'စာ']
+    """
+    return [s for s in _BREAK_RE.split(run) if s]
+
+def tokenize(text):
+    """Lower-cased Latin words and Myanmar syllables, in reading order"""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if _MYANMAR_RE.match(token):
+            tokens.extend(syllables(token))
+        else:
+            tokens.append(token)
+    return tokens
+
+def word_count(text):
+    """Words in mixed Burmese/English text, counting Burmese by syllables"""
+    latin = 0
+    myanmar = 0
+    for token in _TOKEN_RE.findall(text.lower()):
+        if _MYANMAR_RE.match(token):
+            myanmar += len(syllables(token))
+        else:
+            latin += 1
+    return latin + round(myanmar / SYLLABLES_PER_WORD)
+
+def benchmark(content_dir='content'):
+    texts = []
+    for name in sorted(os.listdir(content_dir)):
+        if name.endswith('.md'):
+            with open(os.path.join(content_dir, name), 'r', encoding='utf-8') as f:
+                texts.append(f.read())
+    size = sum(len(t.encode('utf-8')) for t in texts)
+    started = time.perf_counter()
+    count = sum(len(tokenize(t)) for t in texts)
+    elapsed = time.perf_counter() - started
+    print(f"{len(texts)} files, {size / 1e6:.2f} MB: {count} tokens in {elapsed * 1000:.1f}ms "
+          f"({size / 1e6 / elapsed:.1f} MB/s, {count / elapsed:,.0f} tokens/sec)")
+
+if __name__ == "__main__":
+    benchmark(sys.argv[1] if len(sys.argv) > 1 else 'content')